@@ -0,0 +1,212 @@
+# Multiplayer arena for the Snake Game
+# Several snakes share one board with the usual rules: walls, obstacles and any snake body (your own
+# or someone else's) are deadly, and food makes a snake grow. Snakes that die come back after a short
+# wait on a random empty cell. Like SnakeGame, the arena has no drawing or networking, and records the
+# cells that change each tick so a server only has to send those.
+
+from collections import deque  # Buffered turns for each player
+
+from snake_engine import SnakeBody, SnakeGame, directions, height, num_obstacles, width
+
+# Ticks a dead snake waits before coming back
+respawn_ticks = 15
+
+# Turns buffered per player (one is applied per tick)
+max_queued_turns = 3
+
+# Cell contents reported by cell_content()
+empty_cell = 0
+obstacle_cell = 1
+food_cell = 2
+first_snake_cell = 3  # A snake cell holds first_snake_cell + the player's id
+
+
+class ArenaSnake:
+    """One player's snake in an arena."""
+
+    def __init__(self, player_id):
+        """Create a player who has not been placed on the board yet."""
+        self.player_id = player_id
+        self.body = SnakeBody()
+        self.length = 1
+        self.x = self.y = 0            # Head position in grid cells
+        self.x_change = self.y_change = 0
+        self.alive = False
+        self.respawn_tick = 0          # Tick when a dead snake comes back
+        self.turn_queue = deque()      # Buffered turns, applied one per tick
+        self.deaths = 0
+
+    @property
+    def score(self):
+        """Current score (the number of blocks the snake has grown since it last spawned)."""
+        return self.length - 1
+
+
+class Arena(SnakeGame):
+    """A board shared by several snakes, advanced one tick at a time with step().
+
+    The board itself (obstacles, food, the occupancy grid and the free-cell index) works exactly
+    as in SnakeGame; only the snake handling is replaced so that there can be many of them.
+    """
+
+    def __init__(self, width=width, height=height, num_obstacles=num_obstacles, seed=None):
+        """Set up an empty arena on a board of the given size (in pixels)."""
+        super().__init__(width, height, num_obstacles, seed)
+
+        # Take away the single-player snake that SnakeGame starts with
+        start_cell = self.snake_body.pop_tail()
+        self.snake_cells[start_cell] = 0
+        self.release_cell(start_cell)
+        self.snake_length = 0
+
+        # Player owning the last snake segment pushed onto each cell
+        self.cell_owner = [0] * (self.cols * self.rows)
+
+        self.players = {}                    # ArenaSnake by player id
+        self.changed_players = set()         # Players whose score or state changed since the last take_changes()
+        self.dirty_cells = []                # Cells that changed since the last take_changes()
+
+    def add_player(self, player_id):
+        """Add a player, whose snake appears on the next tick."""
+        snake = ArenaSnake(player_id)
+        snake.respawn_tick = self.tick + 1
+        self.players[player_id] = snake
+        self.changed_players.add(player_id)
+        return snake
+
+    def remove_player(self, player_id):
+        """Take a player (and their snake) out of the arena."""
+        snake = self.players.pop(player_id)
+        if snake.alive:
+            self.clear_snake(snake)
+        self.changed_players.add(player_id)
+
+    def queue_turn(self, player_id, action):
+        """Buffer a change of direction for a player (ignored if their queue is full)."""
+        snake = self.players.get(player_id)
+        if snake is not None and action in directions and len(snake.turn_queue) < max_queued_turns:
+            snake.turn_queue.append(action)
+
+    def spawn(self, snake):
+        """Place a snake of length one on a random empty cell (or try again next tick if there is none)."""
+        cell = self.sample_free_cell()
+        if cell is None:
+            snake.respawn_tick = self.tick + 1
+            return
+        snake.body = SnakeBody()
+        snake.length = 1
+        snake.y, snake.x = divmod(cell, self.cols)
+        snake.x_change = snake.y_change = 0
+        snake.turn_queue.clear()
+        snake.alive = True
+        self.push_segment(snake, cell)
+        self.changed_players.add(snake.player_id)
+
+    def push_segment(self, snake, cell):
+        """Add a head segment to a snake, keeping the occupancy grid in step."""
+        snake.body.push(cell)
+        self.snake_cells[cell] += 1
+        self.cell_owner[cell] = snake.player_id
+        self.claim_cell(cell)
+        self.dirty_cells.append(cell)
+
+    def pop_segment(self, snake):
+        """Remove a snake's tail segment, keeping the occupancy grid in step."""
+        cell = snake.body.pop_tail()
+        self.snake_cells[cell] -= 1
+        if not self.snake_cells[cell]:
+            self.release_cell(cell)
+            self.dirty_cells.append(cell)
+        elif self.cell_owner[cell] == snake.player_id:
+            # Another segment is still on the cell (only after a collision, so this search is rare):
+            # hand the cell to the snake it belongs to and send the change
+            for other in (snake, *self.players.values()):
+                if other.alive and cell in other.body:
+                    self.cell_owner[cell] = other.player_id
+                    break
+            self.dirty_cells.append(cell)
+
+    def clear_snake(self, snake):
+        """Remove every segment of a snake from the board."""
+        while snake.body.size:
+            self.pop_segment(snake)
+        snake.alive = False
+
+    def step(self, action=None):
+        """Advance every snake by one tick (players steer with queue_turn, so action is unused)."""
+        self.tick += 1
+        snakes = list(self.players.values())
+
+        # Bring back snakes whose wait is over
+        for snake in snakes:
+            if not snake.alive and self.tick >= snake.respawn_tick:
+                self.spawn(snake)
+
+        # Move every snake at the same time: first the new heads and tails...
+        moved = []
+        moves = {}  # Snake by (old head, new head), for spotting snakes that swapped cells
+        for snake in snakes:
+            if not snake.alive:
+                continue
+            if snake.turn_queue:
+                x_change, y_change = directions[snake.turn_queue.popleft()]
+                # The snake cannot turn back onto itself
+                if (x_change, y_change) != (-snake.x_change, -snake.y_change):
+                    snake.x_change, snake.y_change = x_change, y_change
+            if not (snake.x_change or snake.y_change):
+                # A new snake waits where it appeared until its player picks a direction
+                continue
+            old_head = snake.body.head()
+            snake.x += snake.x_change
+            snake.y += snake.y_change
+            if not (0 <= snake.x < self.cols and 0 <= snake.y < self.rows):
+                # Ran into a wall
+                self.kill(snake)
+                continue
+            new_head = snake.y * self.cols + snake.x
+            moves[(old_head, new_head)] = snake
+            self.push_segment(snake, new_head)
+            if snake.body.size > snake.length:
+                self.pop_segment(snake)
+            moved.append(snake)
+
+        # ...then the collisions, so no snake gets an advantage from the order it moved in
+        # (two heads meeting, or a head entering any body, even a snake that is standing still, both count,
+        # and so do two snakes swapping cells head-on, which short snakes can do without ever sharing a cell)
+        dead = [snake for (old_head, new_head), snake in moves.items()
+                if self.snake_cells[new_head] > 1 or self.obstacle_cells[new_head] or (new_head, old_head) in moves]
+        for snake in dead:
+            self.kill(snake)
+
+        # Grow the snakes that reached the food
+        for snake in moved:
+            if snake.alive and snake.body.head() == self.food:
+                snake.length += 1
+                self.changed_players.add(snake.player_id)
+                self.place_food()
+        return True
+
+    def kill(self, snake):
+        """End a snake's life; it comes back after respawn_ticks."""
+        self.clear_snake(snake)
+        snake.deaths += 1
+        snake.respawn_tick = self.tick + respawn_ticks
+        self.changed_players.add(snake.player_id)
+
+    def cell_content(self, cell):
+        """Return what a cell holds: empty_cell, obstacle_cell, food_cell, or first_snake_cell + the id of the player there."""
+        if self.snake_cells[cell]:
+            return first_snake_cell + self.cell_owner[cell]
+        if self.obstacle_cells[cell]:
+            return obstacle_cell
+        if cell == self.food:
+            return food_cell
+        return empty_cell
+
+    def take_changes(self):
+        """Return the sorted cells and player ids that changed since the last call, and start recording afresh."""
+        cells = sorted(set(self.dirty_cells))
+        players = sorted(self.changed_players)
+        self.dirty_cells.clear()
+        self.changed_players.clear()
+        return cells, players
@@ -0,0 +1,158 @@
+# Autopilot for the Snake Game
+# Steers a SnakeGame towards the food using a breadth-first distance field (the number of moves from
+# each cell to the food, going around obstacles). The field only depends on the food and the obstacles,
+# so it is built once per piece of food and reused on every tick until the food moves; the snake's own
+# body, which changes every tick, is handled by checking each candidate move instead. Before taking a
+# move the autopilot makes sure the snake could still reach its own tail afterwards, so it does not
+# wall itself into a pocket.
+
+from snake_engine import directions
+
+# Boards with more cells than this steer by straight-line (Manhattan) distance instead of a distance field
+max_field_cells = 1 << 16
+
+
+class Autopilot:
+    """Chooses moves for one game, keeping its distance field between ticks."""
+
+    def __init__(self, game):
+        """Prepare to steer the given game."""
+        self.game = game
+        self.field = None        # Moves from each cell to the food (-1 where unreachable)
+        self.field_food = None   # Food cell the field was built for
+        self.neighbours = None   # Cells next to each cell that are not obstacles (built with the first field)
+
+    def distance_field(self):
+        """Return the distance field for the current food, rebuilding it only if the food has moved."""
+        game = self.game
+        if self.field_food != game.food:
+            self.field = self.build_field(game.food)
+            self.field_food = game.food
+        return self.field
+
+    def build_neighbours(self):
+        """List the cells next to each cell, leaving out the board edges and obstacles (which never move)."""
+        game = self.game
+        cols = game.cols
+        size = cols * game.rows
+        obstacle_cells = game.obstacle_cells
+        neighbours = []
+        for cell in range(size):
+            x = cell % cols
+            neighbours.append(tuple(neighbour for neighbour in (cell - 1 if x else -1, cell + 1 if x < cols - 1 else -1,
+                                                                cell - cols, cell + cols)
+                                    if 0 <= neighbour < size and not obstacle_cells[neighbour]))
+        return neighbours
+
+    def build_field(self, food):
+        """Breadth-first search outwards from the food, around obstacles."""
+        if self.neighbours is None:
+            self.neighbours = self.build_neighbours()
+        neighbours = self.neighbours
+        field = [-1] * len(neighbours)
+        field[food] = 0
+        frontier = [food]
+        distance = 0
+        while frontier:
+            distance += 1
+            next_frontier = []
+            for cell in frontier:
+                for neighbour in neighbours[cell]:
+                    if field[neighbour] < 0:
+                        field[neighbour] = distance
+                        next_frontier.append(neighbour)
+            frontier = next_frontier
+        return field
+
+    def tail_reachable(self, head, growing):
+        """Check that a snake whose head moved to head could still follow its tail afterwards.
+
+        Searches outwards from the new head through empty cells. It succeeds on reaching the tail
+        (which keeps moving away, so the snake can chase it forever), or on finding more room than
+        the snake is long (enough to keep moving while the body clears).
+        """
+        game = self.game
+        cols = game.cols
+        size = cols * game.rows
+        snake_cells = game.snake_cells
+        obstacle_cells = game.obstacle_cells
+        tail = game.snake_body.tail()
+        if head == tail and not growing:
+            # Following straight behind the tail
+            return True
+        # The tail cell is freed by this move unless the snake is growing
+        target = None if growing else tail
+        limit = game.snake_length + 1
+        seen = {head}
+        frontier = [head]
+        while frontier:
+            next_frontier = []
+            for cell in frontier:
+                x = cell % cols
+                for neighbour in (cell - 1 if x else -1, cell + 1 if x < cols - 1 else -1, cell - cols, cell + cols):
+                    if neighbour < 0 or neighbour >= size or neighbour in seen:
+                        continue
+                    if neighbour == target:
+                        return True
+                    if obstacle_cells[neighbour] or snake_cells[neighbour]:
+                        continue
+                    seen.add(neighbour)
+                    if len(seen) > limit:
+                        return True
+                    next_frontier.append(neighbour)
+            frontier = next_frontier
+        return False
+
+    def choose(self):
+        """Return the action to take on the next tick (None to keep going straight)."""
+        game = self.game
+        cols = game.cols
+        rows = game.rows
+        snake_body = game.snake_body
+        tail = snake_body.tail()
+        growing = snake_body.size < game.snake_length
+        if game.food is None:
+            field = None
+            food_x = food_y = 0
+        elif cols * rows <= max_field_cells:
+            field = self.distance_field()
+        else:
+            field = None
+            food_y, food_x = divmod(game.food, cols)
+
+        # Collect the moves that don't end the game on the next tick, nearest to the food first
+        moves = []
+        for action, (x_step, y_step) in directions.items():
+            # The snake cannot reverse onto itself
+            if x_step == -game.x1_change and y_step == -game.y1_change and (x_step or y_step):
+                continue
+            x = game.x1 + x_step
+            y = game.y1 + y_step
+            if not (0 <= x < cols and 0 <= y < rows):
+                continue
+            cell = y * cols + x
+            # Moving into the current tail is safe, because the tail moves away on the same tick
+            if game.obstacle_cells[cell] or (game.snake_cells[cell] and (cell != tail or growing)):
+                continue
+            if field is not None:
+                distance = field[cell] if field[cell] >= 0 else cols * rows
+            else:
+                distance = abs(food_x - x) + abs(food_y - y)
+            moves.append((distance, action, cell))
+        moves.sort()
+
+        # Take the nearest move that leaves a way out
+        for distance, action, cell in moves:
+            if self.tail_reachable(cell, growing or cell == game.food):
+                return action
+        # Every move looks like a trap: take the nearest one and hope the body clears in time
+        return moves[0][1] if moves else None
+
+
+def autopilot_policy(game, rng):
+    """snake-bench policy: steer with the game's autopilot (rng is unused; the autopilot is deterministic)."""
+    # The autopilot is kept on the game itself, so it is freed along with the game
+    autopilot = getattr(game, 'autopilot', None)
+    if autopilot is None:
+        autopilot = game.autopilot = Autopilot(game)
+    return autopilot.choose()
@@ -0,0 +1,308 @@
+# Vectorized batch engine for the Snake Game
+# Runs many independent games at once, storing every game's state in NumPy arrays and advancing
+# all of them with a single step() call. Used for balancing power-ups and obstacles with scripted or AI players.
+
+import numpy as np  # Array library (every game is one row of each array)
+
+from snake_engine import default_rules, directions
+
+# Actions are direction codes in the order of snake_engine.directions, or -1 to keep going straight
+action_names = list(directions.keys())
+direction_x = np.array([directions[name][0] for name in action_names], dtype=np.int32)
+direction_y = np.array([directions[name][1] for name in action_names], dtype=np.int32)
+
+no_effect = np.iinfo(np.int64).max  # End tick of an unused effect slot
+
+# Death causes recorded for finished games (index 0 means the game did not end by dying)
+death_causes = (None, 'wall', 'self', 'obstacle')
+
+
+class BatchSnakeGame:
+    """A batch of independent Snake games advanced together, following the same rules as SnakeGame."""
+
+    def __init__(self, num_games, width=None, height=None, num_obstacles=None, seed=None, rules=None):
+        """Set up num_games new games on boards of the given size (in pixels; by default the size in the rules)."""
+        if rules is None:
+            rules = default_rules
+        if rules.obstacle_layout != 'random':
+            raise ValueError("BatchSnakeGame only supports random obstacles, not generated levels")
+        self.rules = rules
+        if width is None:
+            width = rules.width
+        if height is None:
+            height = rules.height
+        if num_obstacles is None:
+            num_obstacles = rules.num_obstacles
+        self.num_games = num_games
+        self.cols = width // rules.snake_block
+        self.rows = height // rules.snake_block
+        self.num_cells = self.cols * self.rows
+        board = rules.board(self.cols, self.rows)
+        self.wall_mask = np.frombuffer(board.wall_mask, dtype=np.uint8).astype(bool)
+        self.num_obstacles = min(num_obstacles, self.num_cells - 2 - len(board.walls))
+        self.rng = np.random.default_rng(seed)
+
+        # Power-ups are identified by their position in the rules' power_up_types
+        power_up_types = rules.power_up_types
+        self.power_up_durations = np.array([power_up_types[name]['duration'] for name in rules.power_up_names],
+                                           dtype=np.int64)
+
+        # Amount each power-up adds to each attribute it affects (one row per power-up, one column per attribute)
+        self.effect_names = sorted({name for properties in power_up_types.values() for name in properties['effects']})
+        self.effect_amounts = np.array([[power_up_types[kind]['effects'].get(name, 0) for name in self.effect_names]
+                                        for kind in rules.power_up_names], dtype=np.int64)
+
+        # Most effects a game can have active at once (pickups are always more than power_up_delay[0] ticks apart)
+        max_active_effects = int(self.power_up_durations.max()) // (rules.power_up_delay[0] + 1) + 1
+
+        # Base speed for each score (scores past the end use the last entry)
+        self.speed_schedule = np.array(rules.speed_schedule, dtype=np.int64)
+
+        n = num_games
+        cells = self.num_cells
+        # Room for a snake covering the whole board (plus the extra block from a score multiplier)
+        self.capacity = cells + 2
+
+        # Per-game occupancy grids, one row per game
+        self.snake_cells = np.zeros((n, cells), dtype=np.uint16)
+        self.obstacle_cells = np.zeros((n, cells), dtype=bool)
+        # Flat views of the grids, indexed by game * num_cells + cell
+        self.snake_flat = self.snake_cells.reshape(-1)
+        self.obstacle_flat = self.obstacle_cells.reshape(-1)
+
+        # Snake bodies as ring buffers of cell indexes (tail at body_start, head at body_start + body_size - 1)
+        self.body = np.zeros((n, self.capacity), dtype=np.int32)
+        self.body_start = np.zeros(n, dtype=np.int64)
+        self.body_size = np.zeros(n, dtype=np.int64)
+        self.snake_length = np.ones(n, dtype=np.int64)
+
+        # Head position and direction in grid coordinates
+        self.x1 = np.zeros(n, dtype=np.int64)
+        self.y1 = np.zeros(n, dtype=np.int64)
+        self.x1_change = np.zeros(n, dtype=np.int64)
+        self.y1_change = np.zeros(n, dtype=np.int64)
+
+        self.food = np.zeros(n, dtype=np.int64)
+        self.base_speed = np.full(n, rules.base_snake_speed, dtype=np.int64)
+        self.tick = np.zeros(n, dtype=np.int64)
+
+        # Attributes adjusted by power-up effects (as in SnakeGame)
+        self.speed_bonus = np.zeros(n, dtype=np.int64)
+        self.food_growth = np.ones(n, dtype=np.int64)
+        self.invincible = np.zeros(n, dtype=np.int64)
+
+        # Power-up on the board (-1 when there is none)
+        self.power_up_cell = np.full(n, -1, dtype=np.int64)
+        self.power_up_type = np.zeros(n, dtype=np.int64)
+        self.power_up_timer = np.zeros(n, dtype=np.int64)
+        self.power_up_spawn_time = np.zeros(n, dtype=np.int64)
+        self.power_ups_collected = np.zeros(n, dtype=np.int64)
+
+        # Active effects: a few slots per game holding the tick each effect ends (no_effect when unused) and its power-up
+        self.effect_end = np.full((n, max_active_effects), no_effect, dtype=np.int64)
+        self.effect_type = np.zeros((n, max_active_effects), dtype=np.int64)
+
+        # Results of the games that finished on the last step (kept until the next step)
+        self.final_score = np.zeros(n, dtype=np.int64)
+        self.final_tick = np.zeros(n, dtype=np.int64)
+        self.final_power_ups = np.zeros(n, dtype=np.int64)
+        self.final_cause = np.zeros(n, dtype=np.int64)
+        self.final_won = np.zeros(n, dtype=bool)
+
+        self.reset(np.arange(n))
+
+    @property
+    def score(self):
+        """Current score of every game."""
+        return self.snake_length - 1
+
+    @property
+    def snake_speed(self):
+        """Current snake speed of every game, including power-up effects."""
+        return np.maximum(self.rules.min_snake_speed, self.base_speed + self.speed_bonus)
+
+    def apply_effects(self, games, kinds, sign):
+        """Add (sign 1) or take away (sign -1) the effects of one power-up kind per listed game."""
+        for column, name in enumerate(self.effect_names):
+            # add.at handles a game listed more than once
+            np.add.at(getattr(self, name), games, sign * self.effect_amounts[kinds, column])
+
+    def sample_free_cells(self, games, exclude, tries=8):
+        """Pick a random empty cell for each of the given games, avoiding one extra cell per game (or -1).
+
+        Random cells are drawn and redrawn where taken, which takes a try or two on a sparse board.
+        Games still unlucky after a few tries fall back to scanning their whole board, which also
+        finds full boards (returned as -1).
+        """
+        cells = np.full(len(games), -1, dtype=np.int64)
+        pending = np.arange(len(games))
+        for _ in range(tries):
+            candidates = self.rng.integers(0, self.num_cells, len(pending))
+            flat = games[pending] * self.num_cells + candidates
+            free = (self.snake_flat[flat] == 0) & ~self.obstacle_flat[flat] & (candidates != exclude[pending])
+            cells[pending[free]] = candidates[free]
+            pending = pending[~free]
+            if len(pending) == 0:
+                return cells
+        # Slow path: choose uniformly among all the empty cells of each remaining board
+        rows = games[pending]
+        free = (self.snake_cells[rows] == 0) & ~self.obstacle_cells[rows]
+        excluded = exclude[pending] >= 0
+        free[np.nonzero(excluded)[0], exclude[pending][excluded]] = False
+        keys = np.where(free, self.rng.random(free.shape), -1.0)
+        chosen = keys.argmax(axis=1)
+        cells[pending] = np.where(keys[np.arange(len(rows)), chosen] >= 0, chosen, -1)
+        return cells
+
+    def reset(self, games):
+        """Start new games in the given rows."""
+        if len(games) == 0:
+            return
+        self.snake_cells[games] = 0
+        self.obstacle_cells[games] = self.wall_mask  # The rules' fixed walls (if any)
+
+        # Place the snake in the center of the board, standing still
+        self.x1[games] = self.cols // 2
+        self.y1[games] = self.rows // 2
+        self.x1_change[games] = 0
+        self.y1_change[games] = 0
+        start_cell = (self.rows // 2) * self.cols + self.cols // 2
+        self.body[games, 0] = start_cell
+        self.body_start[games] = 0
+        self.body_size[games] = 1
+        self.snake_length[games] = 1
+        self.snake_cells[games, start_cell] = 1
+
+        self.base_speed[games] = self.rules.base_snake_speed
+        self.tick[games] = 0
+
+        # Generate obstacles one at a time on empty cells (never on the snake or another obstacle)
+        no_exclusion = np.full(len(games), -1, dtype=np.int64)
+        for _ in range(self.num_obstacles):
+            self.obstacle_cells[games, self.sample_free_cells(games, no_exclusion)] = True
+
+        # Place the food on an empty cell
+        self.food[games] = self.sample_free_cells(games, no_exclusion)
+
+        # Reset the power-up timers
+        self.power_up_cell[games] = -1
+        self.power_up_timer[games] = 0
+        first_delay = self.rules.first_power_up_delay
+        self.power_up_spawn_time[games] = self.rng.integers(first_delay[0], first_delay[1] + 1, len(games))
+        self.power_ups_collected[games] = 0
+        self.effect_end[games] = no_effect
+        self.speed_bonus[games] = 0
+        self.food_growth[games] = 1
+        self.invincible[games] = 0
+
+    def step(self, actions):
+        """Advance every game by one tick and return a mask of the games that ended.
+
+        Finished games are recorded in the final_* arrays and restarted immediately.
+        """
+        n = self.num_games
+        everyone = np.arange(n)
+        actions = np.asarray(actions)
+        self.tick += 1
+        tick = self.tick
+
+        # Change direction, ignoring 'keep going' (-1) and direct reversals
+        turning = actions >= 0
+        new_x = np.where(turning, direction_x[np.where(turning, actions, 0)], self.x1_change)
+        new_y = np.where(turning, direction_y[np.where(turning, actions, 0)], self.y1_change)
+        reversing = (new_x == -self.x1_change) & (new_y == -self.y1_change) & turning
+        turning &= ~reversing
+        self.x1_change = np.where(turning, new_x, self.x1_change)
+        self.y1_change = np.where(turning, new_y, self.y1_change)
+
+        # Update the snakes' positions
+        self.x1 += self.x1_change
+        self.y1 += self.y1_change
+
+        # Boundary collision detection (invincible snakes wrap around instead)
+        invincible = self.invincible > 0
+        outside = (self.x1 < 0) | (self.x1 >= self.cols) | (self.y1 < 0) | (self.y1 >= self.rows)
+        hit_wall = outside & ~invincible
+        np.mod(self.x1, self.cols, out=self.x1)
+        np.mod(self.y1, self.rows, out=self.y1)
+        cause = np.where(hit_wall, 1, 0)
+
+        # Move every surviving snake: push the new head and drop the tail
+        moving = np.nonzero(~hit_wall)[0]
+        head = self.y1 * self.cols + self.x1
+        moving_head = head[moving]
+        end = (self.body_start[moving] + self.body_size[moving]) % self.capacity
+        self.body[moving, end] = moving_head
+        self.body_size[moving] += 1
+        self.snake_flat[moving * self.num_cells + moving_head] += 1
+        trimming = moving[self.body_size[moving] > self.snake_length[moving]]
+        tail = self.body[trimming, self.body_start[trimming]]
+        self.snake_flat[trimming * self.num_cells + tail] -= 1
+        self.body_start[trimming] = (self.body_start[trimming] + 1) % self.capacity
+        self.body_size[trimming] -= 1
+
+        # Collision detection with self and obstacles (skipped while invincible)
+        vulnerable = moving[~invincible[moving]]
+        flat = vulnerable * self.num_cells + head[vulnerable]
+        hit_self = self.snake_flat[flat] > 1
+        hit_obstacle = self.obstacle_flat[flat] & ~hit_self
+        cause[vulnerable[hit_self]] = 2
+        cause[vulnerable[hit_obstacle]] = 3
+        alive = cause == 0
+
+        # Spawn power-ups where the timer has run out
+        spawning = np.nonzero(alive & (self.power_up_cell < 0)
+                              & (tick - self.power_up_timer > self.power_up_spawn_time))[0]
+        if len(spawning):
+            cells = self.sample_free_cells(spawning, self.food[spawning])
+            placed = cells >= 0
+            spawning = spawning[placed]
+            self.power_up_cell[spawning] = cells[placed]
+            self.power_up_type[spawning] = self.rng.integers(0, len(self.power_up_durations), len(spawning))
+
+        # Collect power-ups
+        collecting = np.nonzero(alive & (self.power_up_cell == head))[0]
+        if len(collecting):
+            kind = self.power_up_type[collecting]
+            # Apply the effects and store when they end in a free slot
+            slot = np.argmax(self.effect_end[collecting] == no_effect, axis=1)
+            self.effect_end[collecting, slot] = tick[collecting] + self.power_up_durations[kind]
+            self.effect_type[collecting, slot] = kind
+            self.apply_effects(collecting, kind, 1)
+            self.power_up_cell[collecting] = -1
+            self.power_up_timer[collecting] = tick[collecting]
+            delay = self.rules.power_up_delay
+            self.power_up_spawn_time[collecting] = self.rng.integers(delay[0], delay[1] + 1, len(collecting))
+            self.power_ups_collected[collecting] += 1
+
+        # Undo the effects of power-ups that have run out
+        expiring, slot = np.nonzero(self.effect_end <= tick[:, None])
+        if len(expiring):
+            self.apply_effects(expiring, self.effect_type[expiring, slot], -1)
+            self.effect_end[expiring, slot] = no_effect
+
+        # Eat food: grow, speed up along the speed schedule (unless slowed down), and place new food
+        won = np.zeros(n, dtype=bool)
+        eating = np.nonzero(alive & (head == self.food))[0]
+        if len(eating):
+            self.snake_length[eating] += self.food_growth[eating]
+            np.minimum(self.snake_length, self.capacity, out=self.snake_length)
+            speeding = eating[self.speed_bonus[eating] >= 0]
+            score = np.minimum(self.snake_length[speeding] - 1, len(self.speed_schedule) - 1)
+            self.base_speed[speeding] = self.speed_schedule[score]
+            food = self.sample_free_cells(eating, self.power_up_cell[eating])
+            self.food[eating] = food
+            # A game with no room left for food is won
+            won[eating[food < 0]] = True
+
+        # Record and restart finished games
+        done = ~alive | won
+        finished = everyone[done]
+        if len(finished):
+            self.final_score[finished] = self.snake_length[finished] - 1
+            self.final_tick[finished] = tick[finished]
+            self.final_power_ups[finished] = self.power_ups_collected[finished]
+            self.final_cause[finished] = cause[finished]
+            self.final_won[finished] = won[finished]
+            self.reset(finished)
+        return done
@@ -0,0 +1,240 @@
+# snake-bench: tournament runner for Snake bot policies
+# Plays a number of seeded games per policy across a pool of worker processes and writes
+# aggregated results (scores, survival, power-up pickups, and deaths by cause) to a JSON file.
+# Finished chunks are checkpointed, so an interrupted run picks up where it left off.
+#
+# Usage: python snake_bench.py --policies random,greedy --games 10000 --output results.json
+#        python snake_bench.py --profile walled   (play under the rules of a profile from snake_profiles)
+
+import argparse     # For command line options
+import json         # For the results and checkpoint files
+import os           # For operating system interactions (file handling and CPU count)
+import random       # For random policies
+from concurrent.futures import ProcessPoolExecutor, as_completed  # Worker process pool
+
+from snake_autopilot import autopilot_policy
+from snake_engine import SnakeGame, default_rules, directions
+from snake_profiles import load_profile
+
+# Outcomes a game can end with
+outcomes = ('wall', 'self', 'obstacle', 'won', 'timeout')
+
+
+def random_policy(game, rng):
+    """Turn in a random direction about half the time."""
+    if rng.random() < 0.5:
+        return rng.choice(list(directions))
+    return None
+
+
+def greedy_policy(game, rng):
+    """Head straight for the food, avoiding moves that would end the game on the next tick."""
+    food_x, food_y = game.cell_position(game.food)
+    best_action = None
+    best_distance = None
+    for action, (x_step, y_step) in directions.items():
+        # The snake cannot reverse onto itself
+        if x_step == -game.x1_change and y_step == -game.y1_change and (x_step or y_step):
+            continue
+        x = game.x1 + x_step
+        y = game.y1 + y_step
+        if not (0 <= x < game.cols and 0 <= y < game.rows):
+            continue
+        cell = y * game.cols + x
+        # Moving into the current tail is safe, because the tail moves away on the same tick
+        if game.obstacle_cells[cell] or (game.snake_cells[cell] and cell != game.snake_body.tail()):
+            continue
+        distance = abs(food_x - x) + abs(food_y - y)
+        if best_distance is None or distance < best_distance:
+            best_action = action
+            best_distance = distance
+    return best_action
+
+
+# Policies available to the tournament, by name
+policies = {
+    'random': random_policy,
+    'greedy': greedy_policy,
+    'autopilot': autopilot_policy,
+}
+
+
+def new_stats():
+    """Return empty statistics for a set of games."""
+    return {
+        'games': 0,
+        'total_score': 0,
+        'total_ticks': 0,
+        'total_power_ups': 0,
+        'scores': {},                          # Number of games ending with each score
+        'outcomes': dict.fromkeys(outcomes, 0),
+    }
+
+
+def merge_stats(total, stats):
+    """Add the statistics of one set of games into a running total."""
+    for key in ('games', 'total_score', 'total_ticks', 'total_power_ups'):
+        total[key] += stats[key]
+    for score, count in stats['scores'].items():
+        total['scores'][score] = total['scores'].get(score, 0) + count
+    for outcome, count in stats['outcomes'].items():
+        total['outcomes'][outcome] += count
+
+
+def play_chunk(policy_name, first_seed, num_games, max_ticks, profile=default_rules.name):
+    """Play num_games games of one policy with consecutive seeds under a rule profile and return their statistics."""
+    policy = policies[policy_name]
+    rules = load_profile(profile)
+    stats = new_stats()
+    for seed in range(first_seed, first_seed + num_games):
+        rng = random.Random(seed)  # Randomness used by the policy
+        game = SnakeGame(seed=seed, rules=rules)
+        while game.tick < max_ticks and game.step(policy(game, rng)):
+            pass
+
+        if game.won:
+            outcome = 'won'
+        elif game.death_cause:
+            outcome = game.death_cause
+        else:
+            outcome = 'timeout'
+
+        stats['games'] += 1
+        stats['total_score'] += game.score
+        stats['total_ticks'] += game.tick
+        stats['total_power_ups'] += game.power_ups_collected
+        score = str(game.score)  # String keys, to match the JSON checkpoint
+        stats['scores'][score] = stats['scores'].get(score, 0) + 1
+        stats['outcomes'][outcome] += 1
+    return stats
+
+
+def summarize(stats):
+    """Turn accumulated statistics into the figures reported in the results file."""
+    games = stats['games']
+    scores = sorted((int(score), count) for score, count in stats['scores'].items())
+
+    def percentile(fraction):
+        # Smallest score reached by at least the given fraction of games
+        needed = fraction * games
+        seen = 0
+        for score, count in scores:
+            seen += count
+            if seen >= needed:
+                return score
+        return 0
+
+    return {
+        'games': games,
+        'mean_score': stats['total_score'] / games if games else 0,
+        'median_score': percentile(0.5),
+        'p90_score': percentile(0.9),
+        'max_score': scores[-1][0] if scores else 0,
+        'mean_survival_ticks': stats['total_ticks'] / games if games else 0,
+        'power_ups_per_game': stats['total_power_ups'] / games if games else 0,
+        'power_ups_per_1000_ticks': 1000 * stats['total_power_ups'] / stats['total_ticks'] if stats['total_ticks'] else 0,
+        'outcomes': stats['outcomes'],
+        'score_distribution': {str(score): count for score, count in scores},
+    }
+
+
+def load_checkpoint(path, profile, max_ticks):
+    """Return the chunks already finished by an earlier run, keyed by (policy, first seed, number of games).
+
+    Only chunks played under the same profile and max_ticks are returned, so a run with different
+    settings never reuses them.
+    """
+    done = {}
+    if not os.path.exists(path):
+        return done
+    with open(path, 'r') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # A line cut short by an interruption; that chunk is simply played again
+                continue
+            if entry.get('profile') == profile and entry.get('max_ticks') == max_ticks and 'first_seed' in entry:
+                done[(entry['policy'], entry['first_seed'], entry['count'])] = entry['stats']
+    return done
+
+
+def run(policy_names, num_games, seed, chunk_size, workers, max_ticks, output, profile=default_rules.name):
+    """Play the tournament, checkpointing finished chunks, and write the results file."""
+    checkpoint_file = output + '.partial'
+    done = load_checkpoint(checkpoint_file, profile, max_ticks)
+
+    # Split each policy's games into chunks of consecutive seeds
+    chunks = []
+    for name in policy_names:
+        for chunk in range(0, (num_games + chunk_size - 1) // chunk_size):
+            count = min(chunk_size, num_games - chunk * chunk_size)
+            chunks.append((name, seed + chunk * chunk_size, count))
+
+    remaining = [chunk for chunk in chunks if chunk not in done]
+    print(f"{len(chunks) - len(remaining)} of {len(chunks)} chunks already finished")
+
+    with open(checkpoint_file, 'a') as checkpoint, ProcessPoolExecutor(workers) as pool:
+        if checkpoint.tell():
+            # Start on a fresh line in case the last run stopped halfway through writing one
+            checkpoint.write('\n')
+        futures = {pool.submit(play_chunk, name, first_seed, count, max_ticks, profile): (name, first_seed, count)
+                   for name, first_seed, count in remaining}
+        for future in as_completed(futures):
+            chunk = futures[future]
+            name, first_seed, count = chunk
+            stats = future.result()
+            done[chunk] = stats
+            # Record the chunk (with everything that affects its games) straight away so an interrupted run can resume
+            checkpoint.write(json.dumps({'policy': name, 'first_seed': first_seed, 'count': count,
+                                         'max_ticks': max_ticks, 'profile': profile, 'stats': stats}) + '\n')
+            checkpoint.flush()
+            os.fsync(checkpoint.fileno())
+
+    # Combine the chunks of each policy
+    results = {'games_per_policy': num_games, 'seed': seed, 'max_ticks': max_ticks, 'profile': profile,
+               'policies': {}}
+    totals = {name: new_stats() for name in policy_names}
+    for chunk in chunks:
+        merge_stats(totals[chunk[0]], done[chunk])
+    for name in policy_names:
+        results['policies'][name] = summarize(totals[name])
+
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    os.remove(checkpoint_file)
+    return results
+
+
+def main(argv=None):
+    """Command line entry point for snake-bench."""
+    parser = argparse.ArgumentParser(prog='snake-bench', description='Play seeded Snake games with bot policies.')
+    parser.add_argument('--policies', default=','.join(policies),
+                        help='comma separated policy names (default: all of %(default)s)')
+    parser.add_argument('--games', type=int, default=1000, help='games per policy')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the first game')
+    parser.add_argument('--chunk-size', type=int, default=100, help='games per work unit and checkpoint')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='worker processes')
+    parser.add_argument('--max-ticks', type=int, default=100000, help='ticks before a game counts as a timeout')
+    parser.add_argument('--output', default='bench_results.json', help='results file')
+    parser.add_argument('--profile', default=default_rules.name, help='rule profile to play under (name or file)')
+    args = parser.parse_args(argv)
+
+    policy_names = args.policies.split(',')
+    for name in policy_names:
+        if name not in policies:
+            parser.error(f"unknown policy {name!r} (choose from {', '.join(policies)})")
+    try:
+        load_profile(args.profile)
+    except ValueError as error:
+        parser.error(str(error))
+
+    results = run(policy_names, args.games, args.seed, args.chunk_size, args.workers, args.max_ticks, args.output,
+                  args.profile)
+    for name, summary in results['policies'].items():
+        print(f"{name}: mean score {summary['mean_score']:.2f}, "
+              f"mean survival {summary['mean_survival_ticks']:.0f} ticks, outcomes {summary['outcomes']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,321 @@
+# Performance benchmarks for the Snake Game
+# Measures simulation throughput, spawn and collision cost, and rendering cost (under SDL's dummy
+# video driver, so no window is needed), writes the results to JSON, and compares them with a stored
+# baseline so that slowdowns are caught before a release.
+#
+# Usage: python snake_benchmarks.py                  (run and compare with benchmark_baseline.json)
+#        python snake_benchmarks.py --save-baseline  (run and store the results as the new baseline)
+
+import argparse     # For command line options
+import json         # For the results and baseline files
+import os           # For operating system interactions (file paths)
+import platform     # For recording which machine produced the results
+import random       # For the bot steering the large-world snake
+import sys          # For the exit status
+from time import perf_counter  # High resolution timer
+
+from snake_autopilot import Autopilot
+from snake_bench import greedy_policy
+from snake_engine import SnakeGame, snake_block
+
+# Stored baseline results, next to this script
+baseline_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baseline.json')
+
+# Shortest timed round for the sub-microsecond benchmarks (shorter rounds mostly measure timer noise)
+min_round_time = 0.02
+
+
+def best_time(function, number, repeat=9):
+    """Return the fastest time per call of function over several rounds of number calls."""
+    best = None
+    for _ in range(repeat):
+        start = perf_counter()
+        for _ in range(number):
+            function()
+        elapsed = (perf_counter() - start) / number
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def calls_for_round(function, round_time=min_round_time):
+    """Return how many calls of function take at least round_time seconds (doubling the count, like timeit's autorange)."""
+    number = 1
+    while True:
+        start = perf_counter()
+        for _ in range(number):
+            function()
+        if perf_counter() - start >= round_time:
+            return number
+        number *= 2
+
+
+def best_times(functions, repeat=15):
+    """Return the fastest time per call of each function, with every round lasting at least min_round_time.
+
+    The functions take turns, one round each, so every benchmark is spread over the whole run and a spell
+    of load from elsewhere on the machine slows a few rounds of each rather than every round of one.
+    """
+    numbers = [calls_for_round(function) for function in functions]
+    best = [None] * len(functions)
+    for _ in range(repeat):
+        for i, (function, number) in enumerate(zip(functions, numbers)):
+            start = perf_counter()
+            for _ in range(number):
+                function()
+            elapsed = (perf_counter() - start) / number
+            if best[i] is None or elapsed < best[i]:
+                best[i] = elapsed
+    return best
+
+
+def cycle_actions(cols, rows):
+    """Return the action for each cell of a route that visits every cell and loops back to the start.
+
+    The route snakes along the rows from column 1 onwards and returns up column 0, so a snake
+    following it never runs into itself (rows must be even).
+    """
+    actions = [None] * (cols * rows)
+    for y in range(rows):
+        for x in range(cols):
+            if x == 0:
+                action = 'up' if y > 0 else 'right'
+            elif y % 2 == 0:
+                action = 'right' if x < cols - 1 else 'down'
+            elif x > 1:
+                action = 'left'
+            else:
+                action = 'down' if y < rows - 1 else 'left'
+            actions[y * cols + x] = action
+    return actions
+
+
+def cycle_cells(cols, rows, length):
+    """Return the first length cells of the route from cycle_actions, in order."""
+    steps = {'left': -1, 'right': 1, 'up': -cols, 'down': cols}
+    actions = cycle_actions(cols, rows)
+    cells = [0]
+    while len(cells) < length:
+        cells.append(cells[-1] + steps[actions[cells[-1]]])
+    return cells
+
+
+def lay_snake(game, cells):
+    """Replace the snake of a fresh game with a body covering the given cells (tail first)."""
+    # Remove the starting snake
+    start = game.snake_body.pop_tail()
+    game.snake_cells[start] = 0
+    game.release_cell(start)
+    # Lay the new body
+    for cell in cells:
+        game.snake_body.push(cell)
+        game.snake_cells[cell] += 1
+        game.claim_cell(cell)
+    game.snake_length = len(cells)
+    game.x1, game.y1 = game.cell_position(cells[-1])
+    # Head in the direction of the last segment, so the route's next move is never a reversal
+    if len(cells) > 1:
+        previous_x, previous_y = game.cell_position(cells[-2])
+        game.x1_change, game.y1_change = game.x1 - previous_x, game.y1 - previous_y
+    # Move the food if the body landed on it
+    if game.food is not None and game.snake_cells[game.food]:
+        game.place_food()
+
+
+def check_alive(game, name):
+    """Stop with an error if a benchmark game ended, since its timings would be meaningless."""
+    if game.game_close:
+        raise RuntimeError(f"the {name} benchmark game ended early ({game.death_cause})")
+
+
+def board_for_length(length):
+    """Return (cols, rows) of an obstacle-free board comfortably bigger than a snake of the given length."""
+    side = 40
+    while side * side < 2 * length:
+        side *= 2
+    return side, side
+
+
+def bench_step(length, ticks):
+    """Ticks per second of a snake of the given length following a collision-free route."""
+    cols, rows = board_for_length(length)
+    game = SnakeGame(cols * snake_block, rows * snake_block, 0, seed=1)
+    lay_snake(game, cycle_cells(cols, rows, length))
+    actions = cycle_actions(cols, rows)
+    step = game.step
+
+    def run():
+        for _ in range(ticks):
+            step(actions[game.y1 * cols + game.x1])
+    rate = ticks / best_time(run, 1)
+    check_alive(game, f'step length {length}')
+    return rate
+
+
+def spawn_benchmark(occupancy, free_cell_index):
+    """Return a free-cell sample on a board filled to the given fraction, and its sample count (for best_times)."""
+    cols, rows = 100, 100
+    game = SnakeGame(cols * snake_block, rows * snake_block, 0, seed=1, free_cell_index=free_cell_index)
+    lay_snake(game, cycle_cells(cols, rows, int(cols * rows * occupancy)))
+    return game.sample_free_cell, 1
+
+
+def collision_benchmark(length):
+    """Return a run of occupancy lookups (behind every collision test) beside a snake of the given length, and its lookup count."""
+    cols, rows = board_for_length(length)
+    game = SnakeGame(cols * snake_block, rows * snake_block, 0, seed=1)
+    lay_snake(game, cycle_cells(cols, rows, length))
+    probes = [(i * 7919) % (cols * rows) for i in range(1000)]
+    is_free = game.is_free
+
+    def run():
+        for cell in probes:
+            is_free(cell)
+    return run, len(probes)
+
+
+def bench_autopilot(decisions=2000):
+    """Seconds per autopilot decision on the normal board, including rebuilding the distance field for new food."""
+    game = SnakeGame(seed=1)
+    autopilot = Autopilot(game)
+    autopilot.choose()  # Build the board's neighbour lists before timing
+
+    def run():
+        for _ in range(decisions):
+            if not game.step(autopilot.choose()):
+                raise RuntimeError(f"the autopilot benchmark game ended early ({game.death_cause})")
+    return best_time(run, 1, repeat=3) / decisions
+
+
+def render_benchmarks(results):
+    """Time drawing the board, the large-world view and the game info screen."""
+    import snake_game
+
+    # Render off-screen
+    snake_game.setup(headless=True)
+    pygame = snake_game.pygame
+
+    # Full redraw and typical incremental frame of the normal board (without obstacles) with a long snake
+    game = SnakeGame(snake_game.width, snake_game.height, 0, seed=1)
+    lay_snake(game, cycle_cells(game.cols, game.rows, game.cols * game.rows // 2))
+    renderer = snake_game.BoardRenderer(game)
+    actions = cycle_actions(game.cols, game.rows)
+
+    def full_frame():
+        renderer.invalidate()
+        renderer.draw(0)
+
+    def incremental_frame():
+        game.step(actions[game.y1 * game.cols + game.x1])
+        renderer.draw(0)
+    results['render_full_frame'] = {'value': best_time(full_frame, 50), 'unit': 's', 'better': 'lower'}
+    results['render_incremental_frame'] = {'value': best_time(incremental_frame, 200), 'unit': 's', 'better': 'lower'}
+    check_alive(game, 'incremental render')
+
+    # Large-world view (the camera follows the snake, so it moves every tick)
+    world = SnakeGame(snake_game.large_world_cols * snake_block, snake_game.large_world_rows * snake_block,
+                      snake_game.large_world_obstacles, seed=1)
+    view = snake_game.ViewportRenderer(world)
+    rng = random.Random(1)
+
+    def viewport_frame():
+        world.step(greedy_policy(world, rng))
+        view.draw(0)
+    results['render_large_world_frame'] = {'value': best_time(viewport_frame, 100), 'unit': 's', 'better': 'lower'}
+    check_alive(world, 'large world render')
+
+    # One frame of the game info screen
+    info_lines = snake_game.game_info_screen()
+
+    def info_frame():
+        snake_game.draw_static_screen(info_lines)
+        pygame.display.update()
+    results['menu_game_info_frame'] = {'value': best_time(info_frame, 200), 'unit': 's', 'better': 'lower'}
+
+
+def run_benchmarks(quick=False):
+    """Run every benchmark and return the results by name."""
+    scale = 10 if quick else 1
+    results = {}
+    for length in (10, 1000, 100000):
+        results[f'step_length_{length}'] = {'value': bench_step(length, 20000 // scale), 'unit': 'ticks/s',
+                                            'better': 'higher'}
+
+    # The sub-microsecond benchmarks are timed together, in rounds long enough to rise above timer noise
+    # (their length doesn't depend on quick)
+    timed = {}
+    for occupancy in (0.0, 0.5, 0.9, 0.99):
+        percent = int(occupancy * 100)
+        timed[f'spawn_indexed_{percent}pct'] = spawn_benchmark(occupancy, True)
+        timed[f'spawn_sampled_{percent}pct'] = spawn_benchmark(occupancy, False)
+    for length in (10, 1000, 100000):
+        timed[f'collision_check_length_{length}'] = collision_benchmark(length)
+    times = best_times([function for function, _ in timed.values()])
+    for (name, (_, per_call)), seconds in zip(timed.items(), times):
+        results[name] = {'value': seconds / per_call, 'unit': 's', 'better': 'lower'}
+
+    results['autopilot_decision'] = {'value': bench_autopilot(2000 // scale), 'unit': 's', 'better': 'lower'}
+    render_benchmarks(results)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Return the names of benchmarks that got worse than the baseline by more than threshold (a fraction)."""
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        old = baseline[name]['value']
+        new = result['value']
+        if result['better'] == 'higher':
+            change = (old - new) / old
+        else:
+            change = (new - old) / old
+        status = 'REGRESSION' if change > threshold else 'ok'
+        print(f"{name:34} {old:12.4g} -> {new:12.4g} {result['unit']:8} {-change:+7.1%} {status}")
+        if change > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None):
+    """Command line entry point: run the benchmarks, save them, and compare with the baseline."""
+    parser = argparse.ArgumentParser(description='Run the Snake Game performance benchmarks.')
+    parser.add_argument('--output', default='benchmark_results.json', help='where to write the results')
+    parser.add_argument('--baseline', default=baseline_file, help='baseline results to compare with')
+    parser.add_argument('--save-baseline', action='store_true', help='store these results as the baseline')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='allowed slowdown before a result counts as a regression (default: %(default)s)')
+    parser.add_argument('--quick', action='store_true', help='shorter runs (noisier results)')
+    args = parser.parse_args(argv)
+
+    machine = {'python': platform.python_version(), 'platform': platform.platform(),
+               'processor': platform.processor() or platform.machine()}
+    results = run_benchmarks(args.quick)
+    report = {'machine': machine, 'results': results}
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline to compare with (run with --save-baseline to create one)")
+        return 0
+    with open(args.baseline, 'r') as f:
+        baseline = json.load(f)
+    if baseline['machine'] != machine:
+        print("Note: the baseline was recorded on a different machine or Python version")
+    regressions = compare(results, baseline['results'], args.threshold)
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
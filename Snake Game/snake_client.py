@@ -0,0 +1,252 @@
+# Scripted clients for the Snake multiplayer server
+# Each client keeps a copy of its arena built from the server's snapshot and delta frames, and steers
+# towards the food while avoiding occupied cells. With no --server given, a server is started in this
+# process and, after the run, every client's copy of its arena is checked cell by cell against the
+# server's own state, which tests the whole path end to end over localhost.
+#
+# Usage: python snake_client.py --clients 400 --arenas 100 --seconds 10
+#        python snake_client.py --server 127.0.0.1:8765 --clients 4
+
+import argparse     # For command line options
+import asyncio      # For running many clients in one thread
+import random       # For spreading out the clients' first moves
+import sys          # For the exit status
+from time import perf_counter  # For measuring how long the run took
+
+from snake_arena import Arena, empty_cell, food_cell
+from snake_engine import base_snake_speed, directions
+from snake_replay import read_varint
+from snake_server import (SnakeServer, direction_names, frame_header, join_message, message_format, player_alive,
+                          player_left, snapshot_frame, turn_message, welcome_frame)
+
+
+class ArenaView:
+    """A client's copy of an arena, kept up to date from snapshot and delta frames."""
+
+    def __init__(self, cols, rows):
+        """Start with an empty board of the given size."""
+        self.cols = cols
+        self.rows = rows
+        self.cells = [empty_cell] * (cols * rows)
+        self.players = {}  # (status, score, deaths, head cell or None) by player id
+        self.food = None
+        self.tick = 0
+
+    def apply(self, payload):
+        """Apply a snapshot or delta frame."""
+        kind = payload[0]
+        if kind == snapshot_frame:
+            self.cells = [empty_cell] * (self.cols * self.rows)
+            self.players = {}
+        self.tick, pos = read_varint(payload, 1)
+        count, pos = read_varint(payload, pos)
+        cell = 0
+        for _ in range(count):
+            gap, pos = read_varint(payload, pos)
+            content, pos = read_varint(payload, pos)
+            cell += gap
+            self.cells[cell] = content
+            if content == food_cell:
+                self.food = cell
+        count, pos = read_varint(payload, pos)
+        for _ in range(count):
+            player_id, pos = read_varint(payload, pos)
+            status, pos = read_varint(payload, pos)
+            if status == player_left:
+                self.players.pop(player_id, None)
+                continue
+            score, pos = read_varint(payload, pos)
+            deaths, pos = read_varint(payload, pos)
+            head = None
+            if status == player_alive:
+                head, pos = read_varint(payload, pos)
+            self.players[player_id] = (status, score, deaths, head)
+
+
+class ScriptedClient:
+    """A bot player connected to a server."""
+
+    def __init__(self, arena_number, seed=0):
+        """Prepare a bot that will join the given arena."""
+        self.arena_number = arena_number
+        self.rng = random.Random(seed)
+        self.view = None
+        self.player_id = None
+        self.direction = None     # Direction the snake was last sent
+        self.last_head = None
+        self.bytes_received = 0
+        self.frames_received = 0
+        self.writer = None
+
+    async def run(self, host, port):
+        """Connect, join the arena and play until the connection closes."""
+        reader, self.writer = await asyncio.open_connection(host, port)
+        self.writer.write(message_format.pack(join_message, self.arena_number))
+        try:
+            while True:
+                length, = frame_header.unpack(await reader.readexactly(frame_header.size))
+                payload = await reader.readexactly(length)
+                self.bytes_received += frame_header.size + length
+                self.frames_received += 1
+                if payload[0] == welcome_frame:
+                    self.player_id, pos = read_varint(payload, 1)
+                    cols, pos = read_varint(payload, pos)
+                    rows, pos = read_varint(payload, pos)
+                    self.view = ArenaView(cols, rows)
+                else:
+                    self.view.apply(payload)
+                    self.steer()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.writer.close()
+
+    def steer(self):
+        """Send a turn towards the food if that beats the current direction (avoiding occupied cells)."""
+        view = self.view
+        status, _, _, head = view.players.get(self.player_id, (None, 0, 0, None))
+        if head is None:
+            self.direction = self.last_head = None
+            return
+        if head == self.last_head and self.direction is not None:
+            # No new tick for this snake yet
+            return
+        self.last_head = head
+        y, x = divmod(head, view.cols)
+        food_y, food_x = divmod(view.food, view.cols) if view.food is not None else (y, x)
+
+        best_action = None
+        best_distance = None
+        for action in self.rng.sample(direction_names, len(direction_names)):
+            x_step, y_step = directions[action]
+            # The snake cannot reverse onto itself
+            if self.direction is not None and directions[self.direction] == (-x_step, -y_step):
+                continue
+            new_x = x + x_step
+            new_y = y + y_step
+            if not (0 <= new_x < view.cols and 0 <= new_y < view.rows):
+                continue
+            if view.cells[new_y * view.cols + new_x] not in (empty_cell, food_cell):
+                continue
+            distance = abs(food_x - new_x) + abs(food_y - new_y)
+            if best_distance is None or distance < best_distance:
+                best_action = action
+                best_distance = distance
+        if best_action is not None and best_action != self.direction:
+            self.direction = best_action
+            self.writer.write(message_format.pack(turn_message, direction_names.index(best_action)))
+
+    def close(self):
+        """Disconnect from the server."""
+        if self.writer is not None:
+            self.writer.close()
+
+
+def check_views(server, clients):
+    """Compare each client's copy of its arena with the server's; return the number of clients that differ."""
+    mismatches = 0
+    for client in clients:
+        arena = server.rooms[client.arena_number].arena
+        expected = [arena.cell_content(cell) for cell in range(arena.cols * arena.rows)]
+        players = {player_id: snake.alive for player_id, snake in arena.players.items()}
+        seen = {player_id: state[0] == player_alive for player_id, state in client.view.players.items()}
+        if client.view.cells != expected or client.view.tick != arena.tick or seen != players:
+            mismatches += 1
+    return mismatches
+
+
+def check_head_on(length):
+    """Steer two snakes of the given length into each other head-on; return True if both die (as they should)."""
+    arena = Arena(num_obstacles=0, seed=0)
+    left = arena.add_player(0)
+    right = arena.add_player(1)
+    arena.step()
+    # Lay the snakes out along one row, heads in neighbouring cells, facing each other
+    row = arena.rows // 2 * arena.cols
+    for snake, cells in ((left, range(6 - length, 6)), (right, range(5 + length, 5, -1))):
+        arena.clear_snake(snake)
+        snake.alive = True
+        for cell in cells:
+            arena.push_segment(snake, row + cell)
+        snake.length = length
+        snake.y, snake.x = divmod(row + cells[-1], arena.cols)
+    arena.queue_turn(0, 'right')
+    arena.queue_turn(1, 'left')
+    arena.step()
+    return not left.alive and not right.alive
+
+
+async def run_local(num_clients, num_arenas, seconds, tick_rate, seed):
+    """Start a server in this process, play scripted clients against it, and check their views of the arenas."""
+    server = SnakeServer(tick_rate, seed=seed)
+    port = await server.start('127.0.0.1', 0)
+    clients = [ScriptedClient(i % num_arenas, seed + i) for i in range(num_clients)]
+    tasks = [asyncio.create_task(client.run('127.0.0.1', port)) for client in clients]
+    start = perf_counter()
+    await asyncio.sleep(seconds)
+
+    # Stop the arenas and let every client catch up with the last tick before comparing
+    server.paused = True
+    await asyncio.sleep(1 / tick_rate)
+    for _ in range(100):
+        if all(client.view is not None and client.view.tick == server.rooms[client.arena_number].arena.tick
+               for client in clients):
+            break
+        await asyncio.sleep(0.05)
+    elapsed = perf_counter() - start
+    mismatches = check_views(server, clients)
+    # Snakes meeting head-on always collide, including new (length one) snakes that swap cells
+    head_on_failures = [length for length in (1, 2, 3) if not check_head_on(length)]
+    p50, p99 = server.tick_summary()
+    ticks = max(room.arena.tick for room in server.rooms.values())
+    received = sum(client.bytes_received for client in clients)
+
+    for client in clients:
+        client.close()
+    await asyncio.gather(*tasks)
+    await server.close()
+
+    print(f"{num_clients} clients in {num_arenas} arenas, {ticks} ticks in {elapsed:.1f} s")
+    print(f"server tick: p50 {p50:.2f} ms, p99 {p99:.2f} ms (budget {1000 / tick_rate:.1f} ms)")
+    print(f"received {received / max(1, num_clients * ticks):.1f} bytes per client per tick")
+    print(f"{mismatches} of {num_clients} clients disagree with the server")
+    if head_on_failures:
+        print(f"snakes of length {', '.join(map(str, head_on_failures))} passed through each other head-on")
+    return mismatches + len(head_on_failures)
+
+
+async def run_remote(host, port, num_clients, num_arenas, seconds, seed):
+    """Play scripted clients against a running server for a while."""
+    clients = [ScriptedClient(i % num_arenas, seed + i) for i in range(num_clients)]
+    tasks = [asyncio.create_task(client.run(host, port)) for client in clients]
+    await asyncio.sleep(seconds)
+    for client in clients:
+        client.close()
+    await asyncio.gather(*tasks)
+    for client in clients:
+        status = client.view.players.get(client.player_id) if client.view else None
+        print(f"player {client.player_id} in arena {client.arena_number}: {client.frames_received} frames, "
+              f"{client.bytes_received} bytes, last state {status}")
+
+
+def main(argv=None):
+    """Command line entry point for the scripted clients."""
+    parser = argparse.ArgumentParser(description='Play scripted clients against a Snake multiplayer server.')
+    parser.add_argument('--server', help='HOST:PORT of a running server (default: start one here and check it)')
+    parser.add_argument('--clients', type=int, default=400, help='number of clients')
+    parser.add_argument('--arenas', type=int, default=100, help='arenas to spread the clients over')
+    parser.add_argument('--seconds', type=float, default=10, help='how long to play')
+    parser.add_argument('--tick-rate', type=int, default=base_snake_speed, help='ticks per second (local server only)')
+    parser.add_argument('--seed', type=int, default=0, help='seed for the arenas and clients')
+    args = parser.parse_args(argv)
+
+    if args.server:
+        host, port = args.server.rsplit(':', 1)
+        asyncio.run(run_remote(host, int(port), args.clients, args.arenas, args.seconds, args.seed))
+        return 0
+    mismatches = asyncio.run(run_local(args.clients, args.arenas, args.seconds, args.tick_rate, args.seed))
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,627 @@
+# Headless simulation core for the Snake Game
+# Holds the same rules as the interactive game loop, without any drawing or frame pacing,
+# so games can be stepped as fast as the CPU allows (for bots, regression runs, and batch simulations)
+
+import heapq        # Min-heap of active power-up effects, ordered by the tick they end
+import random       # For random number generation (each game has its own seeded generator)
+from array import array  # Compact typed arrays (used for the occupancy grid and snake body)
+
+from snake_levels import generate_level, layouts
+
+# Default board dimensions (match the interactive game window)
+width = 600    # Width of the board in pixels
+height = 400   # Height of the board in pixels
+
+# Snake properties
+snake_block = 10  # Size of each block segment of the snake (for grid-based movement)
+
+# Speed settings (moves per second in the interactive game)
+base_snake_speed = 15  # Initial snake speed
+max_snake_speed = 30   # Food no longer speeds the snake up past this value
+min_snake_speed = 5    # Slow-down effects never take the snake below this value
+speed_up_every = 5     # The snake speeds up by one each time the score reaches a multiple of this
+
+# Number of obstacles generated at the start of each game
+num_obstacles = 10
+
+# How obstacles are laid out: 'random' places num_obstacles on random cells, while the layouts in
+# snake_levels ('maze', 'rooms' and 'scatter') build a level covering obstacle_density of the board
+obstacle_layout = 'random'
+obstacle_density = 0.1
+
+# Boards with more cells than this skip the free-cell index (8 bytes per cell) and place
+# objects by drawing random cells instead, which is just as fast while the board is mostly empty
+max_indexed_cells = 1 << 20
+
+# Movement directions as (x, y) steps in grid cells
+directions = {
+    'left': (-1, 0),
+    'right': (1, 0),
+    'up': (0, -1),
+    'down': (0, 1),
+}
+
+# Define power-up types and their properties
+# Durations are measured in ticks (one tick is one snake move, 75 ticks is about 5 seconds at the base speed)
+# Effects are amounts added to game attributes when the power-up is collected and taken off again when it
+# runs out, so several power-ups can be active at once and a new kind only needs a new entry here
+power_up_types = {
+    'speed_boost': {'duration': 75, 'effects': {'speed_bonus': 5}},         # Increases speed for 75 ticks
+    'slow_down': {'duration': 75, 'effects': {'speed_bonus': -5}},          # Decreases speed for 75 ticks
+    'score_multiplier': {'duration': 75, 'effects': {'food_growth': 1}},    # Doubles score for 75 ticks
+    'invincibility': {'duration': 75, 'effects': {'invincible': 1}},        # Invincibility for 75 ticks
+}
+
+# Game attributes that power-up effects can change
+effect_attributes = ('speed_bonus', 'food_growth', 'invincible')
+
+# Range of ticks (inclusive) before a power-up spawns, at the start of a game and after each pickup
+first_power_up_delay = (75, 225)
+power_up_delay = (150, 300)
+
+# Identity arrays (0, 1, 2, ...) built once per board size and copied for each new game
+identity_arrays = {}
+
+
+def identity_array(size):
+    """Return a new array('i') holding 0 to size - 1."""
+    template = identity_arrays.get(size)
+    if template is None:
+        template = identity_arrays[size] = array('i', range(size))
+    return template[:]
+
+
+def is_whole_number(value):
+    """Check that a setting is an int (and not a bool, which Python also counts as one)."""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+class BoardTables:
+    """Lookup tables for one board size under a set of rules (built by Rules.board)."""
+
+    def __init__(self, cols, rows, walls):
+        """Build the tables for a board of cols x rows cells with the given wall rectangles."""
+        # Wrapped coordinate for each coordinate from -1 to cols (or rows), used by invincible snakes.
+        # Index -1 reads the last entry, so that entry holds the far edge.
+        self.wrap_x = tuple(range(cols)) + (0, cols - 1)
+        self.wrap_y = tuple(range(rows)) + (0, rows - 1)
+
+        # Fixed walls as a list of cells and as an occupancy mask that is copied into each new game
+        self.wall_mask = bytearray(cols * rows)
+        self.walls = []
+        start_cell = (rows // 2) * cols + cols // 2
+        for x, y, wall_width, wall_height in walls:
+            # Parts of a wall that fall outside the board are left out
+            for wall_y in range(max(0, y), min(rows, y + wall_height)):
+                for wall_x in range(max(0, x), min(cols, x + wall_width)):
+                    cell = wall_y * cols + wall_x
+                    if cell == start_cell:
+                        raise ValueError(f"a wall covers the snake's starting cell ({wall_x}, {wall_y})")
+                    if not self.wall_mask[cell]:
+                        self.wall_mask[cell] = 1
+                        self.walls.append(cell)
+
+
+class Rules:
+    """Board and rule settings shared by games, compiled into lookup tables when they are created.
+
+    The defaults are the module settings above; snake_profiles loads other sets of rules from files.
+    """
+
+    def __init__(self, name='classic', width=width, height=height, snake_block=snake_block,
+                 base_snake_speed=base_snake_speed, max_snake_speed=max_snake_speed,
+                 min_snake_speed=min_snake_speed, speed_up_every=speed_up_every, num_obstacles=num_obstacles,
+                 obstacle_layout=obstacle_layout, obstacle_density=obstacle_density, walls=(),
+                 power_up_types=power_up_types, first_power_up_delay=first_power_up_delay,
+                 power_up_delay=power_up_delay):
+        """Check the settings and build the tables that don't depend on the board size.
+
+        walls lists fixed obstacles as (x, y, width, height) rectangles of grid cells.
+        Every mistake in the settings raises ValueError here, before any game is started.
+        """
+        # Check the types first, so the checks and tables below can rely on them
+        whole_number_settings = {'width': width, 'height': height, 'snake_block': snake_block,
+                                 'base_snake_speed': base_snake_speed, 'max_snake_speed': max_snake_speed,
+                                 'min_snake_speed': min_snake_speed, 'speed_up_every': speed_up_every,
+                                 'num_obstacles': num_obstacles}
+        for setting, value in whole_number_settings.items():
+            if not is_whole_number(value):
+                raise ValueError(f"{setting} must be a whole number, not {value!r}")
+        if num_obstacles < 0:
+            raise ValueError("num_obstacles can't be negative")
+        if not isinstance(obstacle_layout, str):
+            raise ValueError("obstacle_layout must be a layout name")
+        if not isinstance(obstacle_density, (int, float)) or isinstance(obstacle_density, bool):
+            raise ValueError("obstacle_density must be a number")
+        for setting, delay in (('first_power_up_delay', first_power_up_delay), ('power_up_delay', power_up_delay)):
+            if (not isinstance(delay, (list, tuple)) or len(delay) != 2
+                    or not all(is_whole_number(value) for value in delay)):
+                raise ValueError(f"{setting} must be two whole numbers of ticks, not {delay!r}")
+        if not isinstance(walls, (list, tuple)) or not all(
+                isinstance(wall, (list, tuple)) and len(wall) == 4 and all(is_whole_number(value) for value in wall)
+                for wall in walls):
+            raise ValueError("walls must be (x, y, width, height) rectangles of whole numbers")
+        if not isinstance(power_up_types, dict):
+            raise ValueError("power_up_types must be a table of power-ups")
+        for power_up_type, properties in power_up_types.items():
+            if not isinstance(properties, dict) or not isinstance(properties.get('effects'), dict):
+                raise ValueError(f"power-up {power_up_type!r} must be a table with a table of 'effects'")
+
+        self.name = name
+        self.width = width
+        self.height = height
+        self.snake_block = snake_block
+        self.base_snake_speed = base_snake_speed
+        self.max_snake_speed = max_snake_speed
+        self.min_snake_speed = min_snake_speed
+        self.speed_up_every = speed_up_every
+        self.num_obstacles = num_obstacles
+        self.obstacle_layout = obstacle_layout
+        self.obstacle_density = obstacle_density
+        self.walls = tuple(tuple(wall) for wall in walls)
+        self.power_up_types = power_up_types
+        self.first_power_up_delay = tuple(first_power_up_delay)
+        self.power_up_delay = tuple(power_up_delay)
+
+        if snake_block < 1 or width < snake_block or height < snake_block:
+            raise ValueError("the board must be at least one block wide and high")
+        if speed_up_every < 1 or not 1 <= min_snake_speed <= base_snake_speed:
+            raise ValueError("speeds must be positive and base_snake_speed at least min_snake_speed")
+        if obstacle_layout != 'random' and obstacle_layout not in layouts:
+            raise ValueError(f"unknown obstacle layout {obstacle_layout!r} (choose from random, {', '.join(layouts)})")
+        if not 0 <= obstacle_density < 1:
+            raise ValueError("obstacle_density must be at least 0 and below 1")
+        if not power_up_types:
+            raise ValueError("at least one power-up type is needed")
+        for power_up_type, properties in power_up_types.items():
+            if set(properties) != {'duration', 'effects'}:
+                raise ValueError(f"power-up {power_up_type!r} needs exactly a 'duration' and 'effects'")
+            if not is_whole_number(properties['duration']) or properties['duration'] < 1:
+                raise ValueError(f"power-up {power_up_type!r} needs a duration of at least one tick")
+            for effect, amount in properties['effects'].items():
+                if effect not in effect_attributes:
+                    raise ValueError(f"power-up {power_up_type!r} has an unknown effect {effect!r}")
+                if not is_whole_number(amount):
+                    raise ValueError(f"power-up {power_up_type!r} needs a whole number for its {effect!r} effect")
+        for delay in (self.first_power_up_delay, self.power_up_delay):
+            if not 0 <= delay[0] <= delay[1]:
+                raise ValueError(f"bad power-up delay range {delay}")
+
+        # Power-up types in a fixed order, for drawing one at random
+        self.power_up_names = list(power_up_types.keys())
+
+        # Base speed for each score, up to the score that reaches the top speed (later scores use the last entry)
+        top_score = max(0, max_snake_speed - base_snake_speed) * speed_up_every
+        self.speed_schedule = [min(max(base_snake_speed, max_snake_speed), base_snake_speed + score // speed_up_every)
+                               for score in range(top_score + 1)]
+
+        # Tables for each board size used so far, starting with the rules' own board (which also
+        # checks the walls now, rather than when the first game starts)
+        self.boards = {}
+        self.board(width // snake_block, height // snake_block)
+
+    def board(self, cols, rows):
+        """Return the lookup tables for a board of the given size (built the first time it is used)."""
+        tables = self.boards.get((cols, rows))
+        if tables is None:
+            tables = self.boards[(cols, rows)] = BoardTables(cols, rows, self.walls)
+        return tables
+
+    def speed_for_score(self, score):
+        """Return the base snake speed for a score."""
+        schedule = self.speed_schedule
+        return schedule[score] if score < len(schedule) else schedule[-1]
+
+
+# The standard rules (the module settings above)
+default_rules = Rules()
+
+
+class SnakeBody:
+    """Ring buffer of packed cell indexes holding the snake's body (tail first, head last)."""
+
+    def __init__(self, capacity=64):
+        """Create an empty body with room for the given number of segments."""
+        self.cells = array('i', bytes(4 * capacity))  # Four bytes per segment
+        self.capacity = capacity
+        self.start = 0  # Buffer index of the tail segment
+        self.size = 0   # Number of segments currently stored
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        """Iterate over the segments from tail to head."""
+        cells = self.cells
+        capacity = self.capacity
+        for i in range(self.start, self.start + self.size):
+            yield cells[i % capacity]
+
+    def head(self):
+        """Return the cell holding the snake's head."""
+        return self.cells[(self.start + self.size - 1) % self.capacity]
+
+    def tail(self):
+        """Return the cell holding the end of the snake's tail."""
+        return self.cells[self.start]
+
+    def push(self, cell):
+        """Add a new head segment."""
+        if self.size == self.capacity:
+            self.grow()
+        end = self.start + self.size
+        if end >= self.capacity:
+            end -= self.capacity
+        self.cells[end] = cell
+        self.size += 1
+
+    def pop_tail(self):
+        """Remove and return the tail segment."""
+        cell = self.cells[self.start]
+        self.start += 1
+        if self.start == self.capacity:
+            self.start = 0
+        self.size -= 1
+        return cell
+
+    def grow(self):
+        """Double the capacity (only happens when the snake outgrows the buffer, never on a normal move)."""
+        cells = array('i', self)
+        cells.extend(array('i', bytes(4 * self.capacity)))
+        self.cells = cells
+        self.start = 0
+        self.capacity *= 2
+
+
+class SnakeGame:
+    """State and rules for a single game of Snake, advanced one tick at a time with step()."""
+
+    def __init__(self, width=None, height=None, num_obstacles=None, seed=None, free_cell_index=None, rules=None,
+                 obstacle_layout=None, level_obstacles=None):
+        """Set up a new game on a board of the given size (in pixels).
+
+        The board size, number of obstacles and obstacle layout default to those of the rules
+        (default_rules if None). All randomness comes from a generator seeded with seed (a random
+        64-bit seed if None), so the same seed and the same actions always play out the same game.
+        free_cell_index chooses whether to keep the free-cell index (by default, only for
+        boards of up to max_indexed_cells cells).
+        level_obstacles passes in the obstacles of a level already generated for this seed (by a
+        snake_levels.LevelPrefetcher), so the level isn't generated again here.
+        """
+        if rules is None:
+            rules = default_rules
+        self.rules = rules
+        if width is None:
+            width = rules.width
+        if height is None:
+            height = rules.height
+        if num_obstacles is None:
+            num_obstacles = rules.num_obstacles
+        if obstacle_layout is None:
+            obstacle_layout = rules.obstacle_layout
+        self.obstacle_layout = obstacle_layout
+        if seed is None:
+            seed = random.getrandbits(64)
+        self.seed = seed
+        self.rng = random.Random(seed)
+
+        # The board is a grid of snake_block cells, and every position is stored as
+        # a packed cell index (y * cols + x) with integer grid coordinates
+        self.cols = width // rules.snake_block
+        self.rows = height // rules.snake_block
+        board = rules.board(self.cols, self.rows)
+        self.wrap_x = board.wrap_x
+        self.wrap_y = board.wrap_y
+
+        # Occupancy grid with one entry per cell, so collision and spawn checks take constant time
+        self.snake_cells = array('H', bytes(2 * self.cols * self.rows))  # Snake segments covering each cell
+        self.obstacle_cells = bytearray(board.wall_mask)                 # 1 where an obstacle (or wall) sits
+
+        # Free-cell index for placing food, obstacles and power-ups in constant time:
+        # free_cells[:free_count] lists every empty cell, and free_index maps a cell to its slot (-1 when taken)
+        if free_cell_index is None:
+            free_cell_index = self.cols * self.rows <= max_indexed_cells
+        if free_cell_index:
+            self.free_cells = identity_array(self.cols * self.rows)
+            self.free_index = identity_array(self.cols * self.rows)
+            self.free_count = self.cols * self.rows
+        else:
+            self.free_cells = self.free_index = None
+
+        self.tick = 0             # Number of ticks simulated so far
+        self.game_close = False   # Flag to check if the game has ended
+        self.death_cause = None   # What ended the game ('wall', 'self' or 'obstacle')
+        self.won = False          # Set when the snake fills the board and no food can be placed
+
+        # Cells whose contents changed since a renderer last drew them
+        # (None while nothing is drawing the game, so headless runs skip the bookkeeping)
+        self.dirty_cells = None
+
+        # Optional frame profiler timing the phases of each tick (None when not profiling)
+        self.profiler = None
+
+        # Snake speed earned by eating, before power-up effects (see snake_speed)
+        self.base_speed = rules.base_snake_speed
+
+        # Attributes adjusted by power-up effects (see power_up_types)
+        self.speed_bonus = 0   # Added to the snake's speed
+        self.food_growth = 1   # Blocks the snake grows per food
+        self.invincible = 0    # Invincibility effects active (walls, self and obstacles are harmless while above 0)
+
+        # Starting position of the snake in grid coordinates (center of the board)
+        self.x1 = self.cols // 2
+        self.y1 = self.rows // 2
+
+        # Variables to track the snake's movement (in cells per tick)
+        self.x1_change = 0
+        self.y1_change = 0
+
+        # Snake body stored as packed cell indexes
+        self.snake_body = SnakeBody()
+        self.snake_length = 1  # Initial length of the snake
+        start_cell = self.y1 * self.cols + self.x1
+        self.snake_body.push(start_cell)
+        self.snake_cells[start_cell] = 1
+        self.claim_cell(start_cell)
+
+        # Variables for power-ups and food
+        self.power_up = None  # Current power-up on the board
+        self.food = None      # Cell holding the food
+
+        # The rules' fixed walls come first
+        self.obstacles = list(board.walls)
+        for cell in board.walls:
+            self.claim_cell(cell)
+
+        if obstacle_layout == 'random':
+            # Generate random positions for obstacles (only empty cells are sampled, so they
+            # never spawn on the snake's starting position or overlap with others)
+            num_obstacles += len(board.walls)
+            while len(self.obstacles) < num_obstacles:
+                cell = self.sample_free_cell()
+                if cell is None:
+                    break
+                self.obstacles.append(cell)
+                self.obstacle_cells[cell] = 1
+                self.claim_cell(cell)
+        else:
+            # Build a level (its own generator is seeded from the game's seed, so it doesn't use self.rng)
+            if level_obstacles is None:
+                level_obstacles = generate_level(self.cols, self.rows, obstacle_layout, rules.obstacle_density, seed,
+                                                 board.wall_mask)
+            for cell in level_obstacles:
+                self.obstacles.append(cell)
+                self.obstacle_cells[cell] = 1
+                self.claim_cell(cell)
+
+        # Generate initial food position on an empty cell
+        self.place_food()
+
+        self.power_up_spawn_time = self.rng.randint(*rules.first_power_up_delay)  # Ticks until the next power-up spawns
+        self.power_up_timer = 0  # Tick when the power-up spawn timer was last reset
+        self.effects = []  # Active power-ups as a min-heap of (tick when the effect ends, power-up type)
+        self.power_ups_collected = 0  # Number of power-ups picked up this game
+
+    @property
+    def score(self):
+        """Current score (the number of blocks the snake has grown)."""
+        return self.snake_length - 1
+
+    @property
+    def snake_speed(self):
+        """Current snake speed in moves per second (only used by callers that pace the game in real time)."""
+        return max(self.rules.min_snake_speed, self.base_speed + self.speed_bonus)
+
+    def active_effects(self):
+        """Return the types of the active power-ups, the one ending soonest first."""
+        return [power_up_type for _, power_up_type in sorted(self.effects)]
+
+    def add_effect(self, power_up_type):
+        """Apply a power-up's effects and schedule their removal once its duration has passed."""
+        properties = self.rules.power_up_types[power_up_type]
+        for name, amount in properties['effects'].items():
+            setattr(self, name, getattr(self, name) + amount)
+        heapq.heappush(self.effects, (self.tick + properties['duration'], power_up_type))
+
+    def expire_effects(self):
+        """Undo the effects of every power-up that has run out by the current tick."""
+        effects = self.effects
+        power_up_types = self.rules.power_up_types
+        while effects and effects[0][0] <= self.tick:
+            _, power_up_type = heapq.heappop(effects)
+            for name, amount in power_up_types[power_up_type]['effects'].items():
+                setattr(self, name, getattr(self, name) - amount)
+
+    def sample_free_cell(self):
+        """Return a uniformly random empty cell, or None if the board is full."""
+        if self.free_index is None:
+            return self.sample_sparse_cell()
+        if not self.free_count:
+            return None
+        return self.free_cells[self.rng.randrange(self.free_count)]
+
+    def sample_sparse_cell(self, tries=64):
+        """Return a uniformly random empty cell on a board without a free-cell index, or None if it is full."""
+        # Draw random cells until an empty one turns up (nearly always the first on a big, mostly empty board)
+        for _ in range(tries):
+            cell = self.rng.randrange(self.cols * self.rows)
+            if self.cell_available(cell):
+                return cell
+        # Fall back to choosing among all the empty cells
+        available = [cell for cell in range(self.cols * self.rows) if self.cell_available(cell)]
+        return self.rng.choice(available) if available else None
+
+    def cell_available(self, cell):
+        """Check whether nothing at all (snake, obstacle, food or power-up) occupies a cell."""
+        if self.snake_cells[cell] or self.obstacle_cells[cell] or cell == self.food:
+            return False
+        return not (self.power_up and cell == self.power_up['cell'])
+
+    def claim_cell(self, cell):
+        """Remove a cell from the free-cell index (swap-remove, does nothing if already taken)."""
+        if self.free_index is None:
+            return
+        slot = self.free_index[cell]
+        if slot < 0:
+            return
+        # Move the last free cell into the vacated slot
+        self.free_count -= 1
+        last = self.free_cells[self.free_count]
+        self.free_cells[slot] = last
+        self.free_index[last] = slot
+        self.free_index[cell] = -1
+
+    def release_cell(self, cell):
+        """Return a cell to the free-cell index if nothing occupies it any more."""
+        if self.free_index is None or self.free_index[cell] >= 0 or not self.cell_available(cell):
+            return
+        self.free_cells[self.free_count] = cell
+        self.free_index[cell] = self.free_count
+        self.free_count += 1
+
+    def place_food(self):
+        """Move the food to a random empty cell, ending the game as a win if none are left."""
+        food = self.sample_free_cell()
+        if food is None:
+            # The snake has filled the board
+            self.food = None
+            self.won = True
+            self.game_close = True
+            return
+        self.food = food
+        self.claim_cell(food)
+        if self.dirty_cells is not None:
+            self.dirty_cells.append(food)
+
+    def cell_position(self, cell):
+        """Return the (x, y) grid coordinates of a cell index."""
+        y, x = divmod(cell, self.cols)
+        return x, y
+
+    def is_free(self, cell):
+        """Check whether a cell holds neither a snake segment nor an obstacle."""
+        return not self.snake_cells[cell] and not self.obstacle_cells[cell]
+
+    def turn(self, action):
+        """Change the snake's direction, ignoring unknown actions and direct reversals."""
+        if action not in directions:
+            return
+        x_change, y_change = directions[action]
+        # The snake cannot turn back onto itself
+        if x_change == -self.x1_change and y_change == -self.y1_change:
+            return
+        self.x1_change = x_change
+        self.y1_change = y_change
+
+    def end_game(self, cause):
+        """Mark the game as lost and record the cause."""
+        self.game_close = True
+        self.death_cause = cause
+
+    def step(self, action=None):
+        """Advance the game by one tick, returning False once the game is over."""
+        if self.game_close:
+            return False
+
+        self.tick += 1
+        current_time = self.tick
+        if action is not None:
+            self.turn(action)
+
+        # Update the snake's position
+        self.x1 += self.x1_change
+        self.y1 += self.y1_change
+
+        # Boundary collision detection
+        if self.x1 >= self.cols or self.x1 < 0 or self.y1 >= self.rows or self.y1 < 0:
+            if not self.invincible:
+                # End the game if not invincible
+                self.end_game('wall')
+                return False
+            # Wrap around effect when invincible
+            self.x1 = self.wrap_x[self.x1]
+            self.y1 = self.wrap_y[self.y1]
+
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.mark('movement')
+
+        # Update the snake's body segments, keeping the occupancy grid in step
+        snake_body = self.snake_body
+        snake_cells = self.snake_cells
+        head_cell = self.y1 * self.cols + self.x1
+        snake_body.push(head_cell)
+        snake_cells[head_cell] += 1
+        self.claim_cell(head_cell)
+        dirty_cells = self.dirty_cells
+        if dirty_cells is not None:
+            dirty_cells.append(head_cell)
+        if snake_body.size > self.snake_length:
+            tail_cell = snake_body.pop_tail()
+            snake_cells[tail_cell] -= 1
+            if not snake_cells[tail_cell]:
+                self.release_cell(tail_cell)
+                if dirty_cells is not None:
+                    dirty_cells.append(tail_cell)
+
+        # Collision detection with self and obstacles (skipped while invincible)
+        if not self.invincible:
+            if snake_cells[head_cell] > 1:
+                # End the game if the snake collides with itself
+                self.end_game('self')
+                return False
+
+            if self.obstacle_cells[head_cell]:
+                # End the game if the snake collides with an obstacle
+                self.end_game('obstacle')
+                return False
+
+        if profiler is not None:
+            profiler.mark('collision')
+
+        # Spawn power-up after a certain number of ticks has passed
+        # (it only spawns on an empty cell, so never on the snake, food, or obstacles)
+        if self.power_up is None and current_time - self.power_up_timer > self.power_up_spawn_time:
+            cell = self.sample_free_cell()
+            if cell is not None:
+                # Randomly select a power-up type
+                power_up_type = self.rng.choice(self.rules.power_up_names)
+                self.claim_cell(cell)
+                if dirty_cells is not None:
+                    dirty_cells.append(cell)
+                # Create the power-up dictionary with its properties
+                self.power_up = {
+                    'type': power_up_type,
+                    'cell': cell,
+                    'duration': self.rules.power_up_types[power_up_type]['duration'],
+                }
+
+        # Check if the snake has collected the power-up
+        if self.power_up and head_cell == self.power_up['cell']:
+            self.add_effect(self.power_up['type'])                        # Apply the power-up's effects
+            self.power_up = None                                          # Remove the power-up from the board
+            self.power_up_timer = current_time                            # Reset the power-up timer
+            self.power_up_spawn_time = self.rng.randint(*self.rules.power_up_delay)  # Set time for the next power-up
+            self.power_ups_collected += 1
+
+        # Undo the effects of power-ups that have run out (only the one ending soonest needs checking)
+        if self.effects and self.effects[0][0] <= current_time:
+            self.expire_effects()
+
+        # Check if the snake has eaten the food
+        if head_cell == self.food:
+            # Increase the snake's length (score), by two blocks with a score multiplier
+            self.snake_length += self.food_growth
+
+            # Speed up as the score grows (looked up in the rules' speed schedule), unless slowed down
+            if self.speed_bonus >= 0:
+                self.base_speed = self.rules.speed_for_score(self.snake_length - 1)
+
+            # Generate new food position on an empty cell (not the snake, obstacles, or power-up)
+            self.place_food()
+            if self.won:
+                return False
+
+        if profiler is not None:
+            profiler.mark('spawning')
+        return True
@@ -1,12 +1,21 @@
 # Snake Game with Power-Ups
 # Developed as a personal project to enhance understanding of game development using Pygame
 
-import pygame       # Library for game development
-import random       # For random number generation (used in placing food, obstacles, and power-ups)
-import os           # For operating system interactions (used in high score file handling)
-
-# Initialize Pygame modules
-pygame.init()
+import argparse     # For command line options
+import os           # For operating system interactions (used for file paths)
+import time         # For formatting leaderboard dates
+from collections import OrderedDict, deque  # Ordered dictionary (text caches) and queue (buffered turns)
+
+from snake_engine import SnakeGame, default_rules, directions  # Headless game rules shared with bots and simulations
+from snake_levels import LevelPrefetcher  # Generates maze, room and scatter levels in the background
+from snake_profiles import load_profile, profile_names  # Rule profiles loaded from files
+from snake_replay import ReplayRecorder  # Records each game's seed and turns so it can be replayed exactly
+from snake_scores import ScoreStore  # Cached high score and leaderboard with crash-safe saving
+from snake_profiler import Profiler  # Per-phase frame timings for the performance overlay
+from snake_autopilot import Autopilot  # Steers the snake in demo mode
+
+# Pygame is imported by setup() rather than here, so importing this module stays fast and opens no window
+pygame = None
 
 # Define color constants (RGB format)
 white = (255, 255, 255)
@@ -20,457 +29,613 @@ purple = (128, 0, 128) # Color for Slow Down power-up
 orange = (255, 165, 0) # Color for Score Multiplier power-up
 cyan = (0, 255, 255)   # Color for Invincibility power-up
 
-# Set up the game window dimensions
-width = 600    # Width of the game window
-height = 400   # Height of the game window
-
-# Create the game window
-game_window = pygame.display.set_mode((width, height))
-pygame.display.set_caption('Snake Game')  # Set the window title
-
-# Create a clock object to control the frame rate
-clock = pygame.time.Clock()
-
-# Snake properties
-snake_block = 10  # Size of each block segment of the snake (for grid-based movement)
-
-# Set up font styles for displaying text
-font_style = pygame.font.SysFont(None, 30)
-score_font = pygame.font.SysFont(None, 25)
-menu_font = pygame.font.SysFont(None, 50)
-pause_font = pygame.font.SysFont(None, 35)
-info_font = pygame.font.SysFont(None, 20)
-
-# File path for storing the high score (ensure the directory exists)
-high_score_file = "./Snake Game/high_score.txt"
-
-def load_high_score():
-    """Load the high score from a file."""
-    # Check if the high score file exists
-    if os.path.exists(high_score_file):
-        with open(high_score_file, 'r') as f:
-            try:
-                # Read and return the high score as an integer
-                return int(f.read())
-            except:
-                # If the file is empty or corrupt, return 0
-                return 0
+# Rules of the games played (changed with select_profile)
+rules = default_rules
+
+# Set up the game window dimensions (the board size of the rules)
+width = rules.width              # Width of the game window
+height = rules.height            # Height of the game window
+snake_block = rules.snake_block  # Size of each grid cell on screen
+
+# The game window (opened by setup())
+game_window = None
+
+# Generates the next level in the background when the rules use a level layout (started by select_profile)
+level_prefetcher = None
+
+# Rendering and input run at a fixed frame rate, independent of the snake's speed
+frame_rate = 60
+max_steps_per_frame = 5   # Limit on catch-up moves after a slow frame
+max_queued_turns = 3      # Key presses buffered ahead of the snake's moves
+
+# Large-world mode: a board far bigger than the window, seen through a camera that follows the snake
+# (drawing cost depends only on the window size, not on these)
+large_world_cols = 4000
+large_world_rows = 4000
+large_world_obstacles = 100000
+chunk_size = 16           # Cells per side of each pre-drawn obstacle chunk
+chunk_cache_size = 256    # Pre-drawn chunks kept in memory
+
+# Map arrow keys to snake directions (filled in by setup(), once the key codes are available)
+direction_keys = {}
+
+# Colors used to draw each power-up type (power-ups added by a profile are drawn in white)
+power_up_colors = {
+    'speed_boost': yellow,
+    'slow_down': purple,
+    'score_multiplier': orange,
+    'invincibility': cyan,
+}
+
+# Font sizes for displaying text (each font is loaded the first time text is drawn in it)
+font_style = 30
+score_font = 25
+menu_font = 50
+pause_font = 35
+info_font = 20
+
+# Loaded fonts keyed by size
+fonts = {}
+
+# Cache of rendered text surfaces keyed by (font, text, color)
+# The least recently used entry is dropped once the cache is full
+text_cache = OrderedDict()
+text_cache_size = 256
+
+# Cache of fully composed static screens (menus and info pages) keyed by their lines of text
+screen_cache = OrderedDict()
+screen_cache_size = 16
+
+# File path for the replay of the most recent game (next to this script)
+replay_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "last_game.replay")
+
+# High score and leaderboard, loaded once by setup() and saved in the background
+scores = None
+
+# Frame profiler (toggled with F3, trace saved with F4)
+profiler = Profiler()
+profile_trace_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "profile_trace.json")
+
+def setup(headless=False):
+    """Start the parts of Pygame the game needs (the display and fonts, not audio) and open the window.
+
+    With headless set, SDL's dummy video driver is used, so nothing appears on screen.
+    Calling setup() again does nothing.
+    """
+    global pygame, game_window, scores
+    if game_window is not None:
+        return
+    if headless:
+        os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    import pygame
+    pygame.display.init()
+    pygame.font.init()
+
+    # Create the game window
+    game_window = pygame.display.set_mode((width, height))
+    pygame.display.set_caption('Snake Game')  # Set the window title
+
+    direction_keys.update({
+        pygame.K_LEFT: 'left',
+        pygame.K_RIGHT: 'right',
+        pygame.K_UP: 'up',
+        pygame.K_DOWN: 'down',
+    })
+    scores = ScoreStore()
+
+def select_profile(new_rules):
+    """Play the following games under a rule profile, resizing the window to its board."""
+    global rules, width, height, snake_block, game_window, level_prefetcher
+    rules = new_rules
+    width = rules.width
+    height = rules.height
+    snake_block = rules.snake_block
+    # Screens composed for the old window size can't be reused
+    screen_cache.clear()
+    if game_window is not None and game_window.get_size() != (width, height):
+        game_window = pygame.display.set_mode((width, height))
+
+    # Start generating the first level now, so it is ready by the time a game starts
+    if level_prefetcher is not None:
+        level_prefetcher.close()
+        level_prefetcher = None
+    if rules.obstacle_layout != 'random':
+        cols = width // snake_block
+        rows = height // snake_block
+        level_prefetcher = LevelPrefetcher(cols, rows, rules.obstacle_layout, rules.obstacle_density,
+                                           rules.board(cols, rows).wall_mask)
+
+def new_game():
+    """Create a game under the current rules (on the prefetched level if the rules use a level layout)."""
+    if level_prefetcher is None:
+        return SnakeGame(width, height, rules=rules)
+    # Take the level generated in the background (the next one starts generating straight away)
+    seed, level = level_prefetcher.next_level()
+    return SnakeGame(width, height, seed=seed, rules=rules, level_obstacles=level)
+
+def get_font(size):
+    """Return the default font at the given size, loading it the first time it is needed."""
+    font = fonts.get(size)
+    if font is None:
+        # The default font is loaded directly, which avoids scanning the system's fonts
+        font = fonts[size] = pygame.font.Font(None, size)
+    return font
+
+def render_text(msg, color, font):
+    """Render a line of text, reusing the surface if the same text was rendered recently."""
+    key = (font, msg, color)
+    surface = text_cache.get(key)
+    if surface is None:
+        # Render the text and remember it, evicting the least recently used entry if the cache is full
+        surface = get_font(font).render(msg, True, color)
+        text_cache[key] = surface
+        if len(text_cache) > text_cache_size:
+            text_cache.popitem(last=False)
     else:
-        # If the file doesn't exist, return 0
-        return 0
-
-def save_high_score(score):
-    """Save the high score to a file."""
-    with open(high_score_file, 'w') as f:
-        # Write the new high score to the file
-        f.write(str(score))
+        # Mark the entry as recently used
+        text_cache.move_to_end(key)
+    return surface
 
 def display_score(score, high_score):
     """Display the current score and high score on the screen."""
     # Render the score text
-    score_text = score_font.render("Score: " + str(score), True, white)
+    score_text = render_text("Score: " + str(score), white, score_font)
     # Render the high score text
-    high_score_text = score_font.render("High Score: " + str(high_score), True, white)
+    high_score_text = render_text("High Score: " + str(high_score), white, score_font)
     # Blit the texts onto the game window at specified positions
     game_window.blit(score_text, [10, 10])
     game_window.blit(high_score_text, [10, 30])
 
-def draw_snake(snake_list):
+def draw_cell(color, cell, cols):
+    """Draw a single grid cell (given as a packed cell index) in the given color."""
+    y, x = divmod(cell, cols)
+    pygame.draw.rect(game_window, color, [x * snake_block, y * snake_block, snake_block, snake_block])
+
+def draw_snake(snake_body, cols):
     """Draw the snake on the screen using rectangles."""
     # Iterate through each segment in the snake's body
-    for x in snake_list:
+    for cell in snake_body:
         # Draw a rectangle for each segment
-        pygame.draw.rect(game_window, green, [x[0], x[1], snake_block, snake_block])
+        draw_cell(green, cell, cols)
 
-def draw_obstacles(obstacles):
+def draw_obstacles(obstacles, cols):
     """Draw obstacles on the screen."""
     # Iterate through the list of obstacles
-    for obstacle in obstacles:
+    for cell in obstacles:
         # Draw each obstacle as a rectangle
-        pygame.draw.rect(game_window, blue, [obstacle[0], obstacle[1], snake_block, snake_block])
+        draw_cell(blue, cell, cols)
 
-def draw_power_up(power_up):
+def draw_power_up(power_up, cols):
     """Draw the power-up on the screen."""
     if power_up:
         # Draw the power-up rectangle with its specific color
-        pygame.draw.rect(game_window, power_up['color'], [power_up['pos'][0], power_up['pos'][1], snake_block, snake_block])
-
-def message_center(msg, color, y_displace=0, font=font_style):
-    """Display a message at the center of the screen."""
-    # Render the message text
-    mesg = font.render(msg, True, color)
-    # Get the rectangle of the text for positioning
-    text_rect = mesg.get_rect(center=(width / 2, height / 2 + y_displace))
-    # Blit the message onto the game window
-    game_window.blit(mesg, text_rect)
-
-def pause(current_score, high_score):
-    """Function to pause the game."""
-    paused = True  # Flag to keep the game paused
-
-    while paused:
-        # Fill the screen with black color
-        game_window.fill(black)
-
-        # Display pause menu options
-        message_center("Game Paused", white, -100, menu_font)
-        message_center(f"Score: {current_score}", white, -50, pause_font)
-        message_center(f"High Score: {high_score}", white, -20, pause_font)
-        message_center("Press R to Resume", white, 20, pause_font)
-        message_center("Press C to Restart", white, 60, pause_font)
-        message_center("Press M for Main Menu", white, 100, pause_font)
-        message_center("Press Q to Quit", white, 140, pause_font)
-        pygame.display.update()
-
-        # Event handling for pause menu
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                # Exit the game if the window is closed
-                paused = False
-                pygame.quit()
-                quit()
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_r:
-                    # Resume the game
-                    paused = False
-                elif event.key == pygame.K_c:
-                    # Restart the game
-                    game_loop()
-                elif event.key == pygame.K_m:
-                    # Go back to main menu
-                    main_menu()
-                elif event.key == pygame.K_q:
-                    # Quit the game
-                    paused = False
-                    pygame.quit()
-                    quit()
-
-        # Control the frame rate of the pause menu
-        clock.tick(15)
-
-def game_loop():
-    """Main function to run the game loop."""
-    game_over = False  # Flag to check if the game is over
-    game_close = False  # Flag to check if the player has lost
-
-    # Load the high score from the file
-    high_score = load_high_score()
-
-    # Initial snake speed settings
-    base_snake_speed = 15
-    snake_speed = base_snake_speed  # Current snake speed
-
-    # Starting position of the snake (center of the screen)
-    x1 = width / 2
-    y1 = height / 2
-
-    # Variables to track the snake's movement
-    x1_change = 0
-    y1_change = 0
-
-    # Snake body represented as a list of coordinates
-    snake_list = []
-    snake_length = 1  # Initial length of the snake
-
-    # Generate obstacles on the screen
-    obstacles = []
-    num_obstacles = 10  # Number of obstacles to generate
-
-    # Generate random positions for obstacles
-    while len(obstacles) < num_obstacles:
-        obs_x = round(random.randrange(0, width - snake_block) / 10.0) * 10.0
-        obs_y = round(random.randrange(0, height - snake_block) / 10.0) * 10.0
-        obstacle_position = [obs_x, obs_y]
-
-        # Ensure obstacles do not spawn on the snake's starting position or overlap with others
-        if obstacle_position != [x1, y1] and obstacle_position not in obstacles:
-            obstacles.append(obstacle_position)
-
-    # Generate initial food position
-    foodx = round(random.randrange(0, width - snake_block) / 10.0) * 10.0
-    foody = round(random.randrange(0, height - snake_block) / 10.0) * 10.0
-
-    # Ensure food does not spawn on an obstacle
-    while [foodx, foody] in obstacles:
-        foodx = round(random.randrange(0, width - snake_block) / 10.0) * 10.0
-        foody = round(random.randrange(0, height - snake_block) / 10.0) * 10.0
-
-    # Variables for power-ups
-    power_up = None  # Current power-up on the screen
-    power_up_spawn_time = random.randint(5000, 15000)  # Time until the next power-up spawns (in milliseconds)
-    power_up_timer = 0  # Timer to track power-up spawning
-    active_power_up = None  # Currently active power-up
-    power_up_end_time = 0  # Time when the power-up effect ends
-
-    # Define power-up types and their properties
-    power_up_types = {
-        'speed_boost': {'color': yellow, 'duration': 5000},        # Increases speed for 5 seconds
-        'slow_down': {'color': purple, 'duration': 5000},          # Decreases speed for 5 seconds
-        'score_multiplier': {'color': orange, 'duration': 5000},   # Doubles score for 5 seconds
-        'invincibility': {'color': cyan, 'duration': 5000},        # Invincibility for 5 seconds
-    }
-
-    while not game_over:
-
-        while game_close:
-            # Fill the screen with black color
+        draw_cell(power_up_colors.get(power_up['type'], white), power_up['cell'], cols)
+
+class BoardRenderer:
+    """Draws the game board incrementally, repainting only the cells that changed since the last frame."""
+
+    def __init__(self, game):
+        """Start tracking changes on the given game."""
+        self.game = game
+        game.dirty_cells = []       # Ask the engine to record changed cells
+        self.full_redraw = True     # The first frame (and any frame after a menu) repaints everything
+        self.hud_values = None      # Score values shown by the last HUD draw
+        self.hud_rect = None        # Screen area covered by the last HUD draw
+        self.overlay_lines = None   # Profiler overlay text shown by the last overlay draw
+        self.overlay_rect = None    # Screen area covered by the last overlay draw
+
+    def invalidate(self):
+        """Repaint the whole board on the next frame (after another screen has drawn over it)."""
+        self.full_redraw = True
+
+    def cell_color(self, cell):
+        """Return the color a cell should be drawn in (snake on top, then power-up, obstacles and food)."""
+        game = self.game
+        if game.snake_cells[cell]:
+            return green
+        if game.power_up and cell == game.power_up['cell']:
+            return power_up_colors.get(game.power_up['type'], white)
+        if game.obstacle_cells[cell]:
+            return blue
+        if cell == game.food:
+            return red
+        return black
+
+    def cell_rect(self, cell):
+        """Return the screen rectangle covered by a cell."""
+        y, x = divmod(cell, self.game.cols)
+        return pygame.Rect(x * snake_block, y * snake_block, snake_block, snake_block)
+
+    def draw_area(self, rect):
+        """Repaint every cell overlapping a screen rectangle."""
+        game = self.game
+        first_x = max(0, rect.left // snake_block)
+        last_x = min(game.cols - 1, (rect.right - 1) // snake_block)
+        first_y = max(0, rect.top // snake_block)
+        last_y = min(game.rows - 1, (rect.bottom - 1) // snake_block)
+        for y in range(first_y, last_y + 1):
+            for x in range(first_x, last_x + 1):
+                cell = y * game.cols + x
+                pygame.draw.rect(game_window, self.cell_color(cell), self.cell_rect(cell))
+
+    def draw_hud(self, high_score):
+        """Draw the score text and return the area it covers."""
+        display_score(self.game.score, high_score)
+        self.hud_values = (self.game.score, high_score)
+        # The score lines are drawn at (10, 10) and (10, 30)
+        font = get_font(score_font)
+        self.hud_rect = pygame.Rect(10, 10, max(font.size("Score: " + str(self.game.score))[0],
+                                                font.size("High Score: " + str(high_score))[0]),
+                                    20 + font.get_linesize())
+        return self.hud_rect
+
+    def draw_overlay(self, overlay, changed):
+        """Draw the profiler overlay if it changed or was drawn over."""
+        old_rect = self.overlay_rect
+        if overlay == self.overlay_lines and (old_rect is None or old_rect.collidelist(changed) == -1):
+            return
+        # Clear the old overlay
+        if old_rect is not None:
+            self.draw_area(old_rect)
+            changed.append(old_rect)
+        self.overlay_lines = overlay
+        self.overlay_rect = draw_overlay_text(overlay)
+        if self.overlay_rect is not None:
+            changed.append(self.overlay_rect)
+
+    def draw(self, high_score, overlay=None):
+        """Draw the current frame, pushing only the changed screen areas to the display."""
+        game = self.game
+        dirty_cells = game.dirty_cells
+
+        if self.full_redraw:
+            # Fill the game window with black color and draw every object
             game_window.fill(black)
-            # Display game over messages
-            message_center("You Lost!", red, -50, menu_font)
-            message_center("Press C-Play Again, M-Main Menu, or Q-Quit", white, 10)
-            # Display the current score and high score
-            display_score(snake_length - 1, high_score)
+            if game.food is not None:
+                draw_cell(red, game.food, game.cols)
+            draw_obstacles(game.obstacles, game.cols)
+            draw_power_up(game.power_up, game.cols)
+            draw_snake(game.snake_body, game.cols)
+            self.draw_hud(high_score)
+            self.overlay_lines = self.overlay_rect = None
+            self.draw_overlay(overlay, [])
+            profiler.mark('draw')
             pygame.display.update()
-
-            # Update high score if the current score is higher
-            if snake_length - 1 > high_score:
-                high_score = snake_length - 1
-                save_high_score(high_score)
-
-            # Event handling for game over screen
-            for event in pygame.event.get():
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_q:
-                        # Quit the game
-                        game_over = True
-                        game_close = False
-                    elif event.key == pygame.K_c:
-                        # Restart the game
-                        game_loop()
-                    elif event.key == pygame.K_m:
-                        # Go back to main menu
-                        main_menu()
-                if event.type == pygame.QUIT:
-                    # Quit the game
-                    game_over = True
-                    game_close = False
-
-        # Event handling during gameplay
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                # Quit the game
-                game_over = True
-                game_close = False
-            if event.type == pygame.KEYDOWN:
-                # Movement controls
-                if event.key == pygame.K_LEFT and x1_change != snake_block:
-                    x1_change = -snake_block
-                    y1_change = 0
-                elif event.key == pygame.K_RIGHT and x1_change != -snake_block:
-                    x1_change = snake_block
-                    y1_change = 0
-                elif event.key == pygame.K_UP and y1_change != snake_block:
-                    y1_change = -snake_block
-                    x1_change = 0
-                elif event.key == pygame.K_DOWN and y1_change != -snake_block:
-                    y1_change = snake_block
-                    x1_change = 0
-                elif event.key == pygame.K_p:
-                    # Pause the game
-                    pause(snake_length - 1, high_score)
-
-        # Update the snake's position
-        x1 += x1_change
-        y1 += y1_change
-
-        # Boundary collision detection
-        if x1 >= width or x1 < 0 or y1 >= height or y1 < 0:
-            if active_power_up != 'invincibility':
-                # End the game if not invincible
-                game_close = True
-            else:
-                # Wrap around effect when invincible
-                x1 = x1 % width
-                y1 = y1 % height
-
-        # Fill the game window with black color
-        game_window.fill(black)
-
-        # Draw the food
-        pygame.draw.rect(game_window, red, [foodx, foody, snake_block, snake_block])
-
-        # Draw the obstacles
-        draw_obstacles(obstacles)
-
-        # Draw the power-up if it exists
-        draw_power_up(power_up)
-
-        # Update the snake's body segments
-        snake_head = [x1, y1]
-        snake_list.append(snake_head)
-        if len(snake_list) > snake_length:
-            del snake_list[0]
-
-        # Collision detection with self and obstacles
-        if active_power_up != 'invincibility':
-            for x in snake_list[:-1]:
-                if x == snake_head:
-                    # End the game if the snake collides with itself
-                    game_close = True
-
-            if snake_head in obstacles:
-                # End the game if the snake collides with an obstacle
-                game_close = True
+            profiler.mark('display_update')
+            dirty_cells.clear()
+            self.full_redraw = False
+            return
+
+        # Repaint only the cells that changed
+        changed = []
+        for cell in dirty_cells:
+            rect = self.cell_rect(cell)
+            pygame.draw.rect(game_window, self.cell_color(cell), rect)
+            changed.append(rect)
+        dirty_cells.clear()
+
+        # Redraw the score when it changes or when a repainted cell sits under it
+        old_hud = self.hud_rect
+        if self.hud_values != (game.score, high_score) or old_hud.collidelist(changed) != -1:
+            self.draw_area(old_hud)
+            new_hud = self.draw_hud(high_score)
+            changed.append(old_hud.union(new_hud))
+
+        # Draw the profiler overlay if it is showing (or clear it once it is switched off)
+        self.draw_overlay(overlay, changed)
+        profiler.mark('draw')
+
+        if changed:
+            pygame.display.update(changed)
+        profiler.mark('display_update')
+
+class ViewportRenderer:
+    """Draws the window-sized part of a large board around the snake's head.
+
+    Obstacles are grouped into square chunks that are drawn once into cached surfaces, and the snake
+    is found by scanning the occupancy grid under the viewport, so a frame costs the same however
+    big the board or the snake gets.
+    """
+
+    def __init__(self, game):
+        """Build the chunk index for the given game."""
+        self.game = game
+        self.view_cols = width // snake_block
+        self.view_rows = height // snake_block
+
+        # Spatial index: the obstacles in each chunk, as offsets within the chunk
+        self.chunks = {}
+        for cell in game.obstacles:
+            y, x = divmod(cell, game.cols)
+            self.chunks.setdefault((x // chunk_size, y // chunk_size), []).append((x % chunk_size, y % chunk_size))
+        self.chunk_surfaces = OrderedDict()  # Pre-drawn chunks, least recently used first
+
+        self.full_redraw = True
+        self.last_tick = None      # Game tick shown by the last frame
+        self.last_overlay = None   # Profiler overlay shown by the last frame
+
+    def invalidate(self):
+        """Redraw the view on the next frame (after another screen has drawn over it)."""
+        self.full_redraw = True
+
+    def chunk_surface(self, key):
+        """Return the pre-drawn surface of a chunk's obstacles, drawing it the first time."""
+        surface = self.chunk_surfaces.get(key)
+        if surface is None:
+            surface = pygame.Surface((chunk_size * snake_block, chunk_size * snake_block))
+            surface.fill(black)
+            for x, y in self.chunks[key]:
+                pygame.draw.rect(surface, blue, [x * snake_block, y * snake_block, snake_block, snake_block])
+            self.chunk_surfaces[key] = surface
+            if len(self.chunk_surfaces) > chunk_cache_size:
+                self.chunk_surfaces.popitem(last=False)
         else:
-            # No collision detection when invincible
-            pass
-
-        # Draw the snake on the screen
-        draw_snake(snake_list)
-        # Display the current score and high score
-        display_score(snake_length - 1, high_score)
-        # Update the display
-        pygame.display.update()
-
-        # Get the current time in milliseconds
-        current_time = pygame.time.get_ticks()
-
-        # Spawn power-up after a certain time has passed
-        if power_up is None and current_time - power_up_timer > power_up_spawn_time:
-            # Randomly select a power-up type
-            power_up_type = random.choice(list(power_up_types.keys()))
-            # Generate random position for the power-up
-            power_up_x = round(random.randrange(0, width - snake_block) / 10.0) * 10.0
-            power_up_y = round(random.randrange(0, height - snake_block) / 10.0) * 10.0
-            # Ensure the power-up does not spawn on the snake, food, or obstacles
-            while [power_up_x, power_up_y] in snake_list or [power_up_x, power_up_y] == [foodx, foody] or [power_up_x, power_up_y] in obstacles:
-                power_up_x = round(random.randrange(0, width - snake_block) / 10.0) * 10.0
-                power_up_y = round(random.randrange(0, height - snake_block) / 10.0) * 10.0
-            # Create the power-up dictionary with its properties
-            power_up = {
-                'type': power_up_type,
-                'pos': [power_up_x, power_up_y],
-                'color': power_up_types[power_up_type]['color'],
-                'duration': power_up_types[power_up_type]['duration'],
-            }
-
-        # Check if the snake has collected the power-up
-        if power_up and x1 == power_up['pos'][0] and y1 == power_up['pos'][1]:
-            active_power_up = power_up['type']             # Set the active power-up
-            power_up_end_time = current_time + power_up['duration']  # Calculate when the effect ends
-            power_up = None                                # Remove the power-up from the screen
-            power_up_timer = current_time                  # Reset the power-up timer
-            power_up_spawn_time = random.randint(10000, 20000)  # Set time for the next power-up
-
-            # Apply the effects of the power-up
-            if active_power_up == 'speed_boost':
-                snake_speed += 5
-            elif active_power_up == 'slow_down':
-                snake_speed = max(5, snake_speed - 5)
-            elif active_power_up == 'score_multiplier':
-                pass  # Handled during scoring
-            elif active_power_up == 'invincibility':
-                pass  # Handled during collision detection
-
-        # Check if the power-up effect has expired
-        if active_power_up and current_time >= power_up_end_time:
-            # Reset the effects of the power-up
-            if active_power_up == 'speed_boost' or active_power_up == 'slow_down':
-                snake_speed = base_snake_speed
-            active_power_up = None
-
-        # Check if the snake has eaten the food
-        if x1 == foodx and y1 == foody:
-            # Generate new food position
-            foodx = round(random.randrange(0, width - snake_block) / 10.0) * 10.0
-            foody = round(random.randrange(0, height - snake_block) / 10.0) * 10.0
-
-            # Ensure food does not spawn on the snake, obstacles, or power-up
-            while [foodx, foody] in obstacles or [foodx, foody] in snake_list or (power_up and [foodx, foody] == power_up['pos']):
-                foodx = round(random.randrange(0, width - snake_block) / 10.0) * 10.0
-                foody = round(random.randrange(0, height - snake_block) / 10.0) * 10.0
-
-            # Increase the snake's length (score)
-            if active_power_up == 'score_multiplier':
-                snake_length += 2  # Double the length increment
-            else:
-                snake_length += 1
-
-            # Increase the snake's speed every 5 points, unless slowed down
-            if (snake_length - 1) % 5 == 0 and snake_speed < 30 and active_power_up != 'slow_down':
-                snake_speed += 1
-
-        # Control the frame rate of the game
-        clock.tick(snake_speed)
-
-    # Quit the game and close the window
-    pygame.quit()
-    quit()
-
-def main_menu():
-    """Function to display the main menu."""
-    menu = True  # Flag to keep the main menu running
-    while menu:
-        # Fill the game window with black color
+            self.chunk_surfaces.move_to_end(key)
+        return surface
+
+    def camera(self):
+        """Return the grid coordinates of the top-left visible cell, keeping the head centered."""
+        game = self.game
+        x0 = min(max(0, game.x1 - self.view_cols // 2), max(0, game.cols - self.view_cols))
+        y0 = min(max(0, game.y1 - self.view_rows // 2), max(0, game.rows - self.view_rows))
+        return x0, y0
+
+    def draw_marker(self, cell, color, x0, y0):
+        """Draw a cell if it is in view, or a small marker at the edge of the view pointing towards it."""
+        y, x = divmod(cell, self.game.cols)
+        x -= x0
+        y -= y0
+        if 0 <= x < self.view_cols and 0 <= y < self.view_rows:
+            pygame.draw.rect(game_window, color, [x * snake_block, y * snake_block, snake_block, snake_block])
+        else:
+            x = min(max(x, 0), self.view_cols - 1)
+            y = min(max(y, 0), self.view_rows - 1)
+            pygame.draw.rect(game_window, color, [x * snake_block + 3, y * snake_block + 3, 4, 4])
+
+    def draw(self, high_score, overlay=None):
+        """Draw the view if the game has moved on since the last frame."""
+        game = self.game
+        if not self.full_redraw and game.tick == self.last_tick and overlay == self.last_overlay:
+            return
+        self.full_redraw = False
+        self.last_tick = game.tick
+        self.last_overlay = overlay
+        x0, y0 = self.camera()
+        x1 = min(x0 + self.view_cols, game.cols)
+        y1 = min(y0 + self.view_rows, game.rows)
+
+        # Static layer: blit the pre-drawn chunks that intersect the view
         game_window.fill(black)
-
-        # Display the game title and menu options
-        message_center("Snake Game", green, -100, menu_font)
-        message_center("Press P to Play", white, -60, pause_font)
-        message_center("Press H for High Score", white, -20, pause_font)
-        message_center("Press I for Game Info", white, 20, pause_font)
-        message_center("Press Q to Quit", white, 60, pause_font)
+        for chunk_y in range(y0 // chunk_size, (y1 - 1) // chunk_size + 1):
+            for chunk_x in range(x0 // chunk_size, (x1 - 1) // chunk_size + 1):
+                if (chunk_x, chunk_y) in self.chunks:
+                    position = ((chunk_x * chunk_size - x0) * snake_block, (chunk_y * chunk_size - y0) * snake_block)
+                    game_window.blit(self.chunk_surface((chunk_x, chunk_y)), position)
+
+        # Food and power-up (or markers pointing at them)
+        if game.food is not None:
+            self.draw_marker(game.food, red, x0, y0)
+        if game.power_up:
+            self.draw_marker(game.power_up['cell'], power_up_colors.get(game.power_up['type'], white), x0, y0)
+
+        # Snake segments in view, read from the occupancy grid row by row
+        snake_cells = game.snake_cells
+        for y in range(y0, y1):
+            row_start = y * game.cols
+            for x, count in enumerate(snake_cells[row_start + x0:row_start + x1]):
+                if count:
+                    pygame.draw.rect(game_window, green,
+                                     [x * snake_block, (y - y0) * snake_block, snake_block, snake_block])
+
+        # Score and profiler overlay on top
+        display_score(game.score, high_score)
+        draw_overlay_text(overlay)
+        profiler.mark('draw')
         pygame.display.update()
-
-        # Event handling for the main menu
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                # Quit the game
-                menu = False
-                pygame.quit()
-                quit()
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_p:
-                    # Start the game
-                    menu = False
-                    game_loop()
-                elif event.key == pygame.K_q:
-                    # Quit the game
-                    menu = False
-                    pygame.quit()
-                    quit()
-                elif event.key == pygame.K_h:
-                    # Show high score
-                    show_high_score()
-                elif event.key == pygame.K_i:
-                    # Show game information
-                    show_game_info()
-
-        # Control the frame rate of the main menu
-        clock.tick(15)
-
-def show_high_score():
-    """Function to display the high score."""
-    high_score = load_high_score()  # Load the high score
-    showing = True  # Flag to keep the high score screen running
-    while showing:
-        # Fill the screen with black color
-        game_window.fill(black)
-        # Display the high score
-        message_center("High Score", green, -50, menu_font)
-        message_center(str(high_score), white, 0, menu_font)
-        message_center("Press B to go back", white, 80, pause_font)
+        profiler.mark('display_update')
+
+def draw_overlay_text(overlay):
+    """Draw the profiler overlay lines in the top-right corner and return the area they cover (None if no lines)."""
+    area = None
+    if overlay:
+        y = 10
+        for line in overlay:
+            text = render_text(line, yellow, info_font)
+            rect = text.get_rect(topright=(width - 10, y))
+            game_window.blit(text, rect)
+            area = rect if area is None else area.union(rect)
+            y += rect.height
+    return area
+
+def queue_turn(turn_queue, action, game):
+    """Buffer a direction change so that quick successive key presses are applied on consecutive moves."""
+    # Compare against the direction the snake will have once the turns already queued are applied
+    if turn_queue:
+        x_change, y_change = directions[turn_queue[-1]]
+    else:
+        x_change, y_change = game.x1_change, game.y1_change
+    new_x, new_y = directions[action]
+    # Ignore presses that would not change direction or would reverse the snake onto itself
+    if (new_x, new_y) == (x_change, y_change) or (new_x, new_y) == (-x_change, -y_change):
+        return
+    if len(turn_queue) < max_queued_turns:
+        turn_queue.append(action)
+
+def message_center(msg, color, y_displace=0, font=font_style, surface=None):
+    """Display a message at the center of the screen (or of another surface)."""
+    if surface is None:
+        surface = game_window
+    # Render the message text
+    mesg = render_text(msg, color, font)
+    # Get the rectangle of the text for positioning
+    text_rect = mesg.get_rect(center=(width / 2, height / 2 + y_displace))
+    # Blit the message onto the surface
+    surface.blit(mesg, text_rect)
+
+def draw_static_screen(lines):
+    """Draw a screen of centered text lines, given as (msg, color, y_displace, font) tuples.
+
+    The screen is composed into a surface the first time it is shown, so later frames cost a single blit.
+    """
+    screen = screen_cache.get(lines)
+    if screen is None:
+        # Compose the screen on a black background
+        screen = pygame.Surface((width, height))
+        screen.fill(black)
+        for msg, color, y_displace, font in lines:
+            message_center(msg, color, y_displace, font, screen)
+        screen_cache[lines] = screen
+        if len(screen_cache) > screen_cache_size:
+            screen_cache.popitem(last=False)
+    else:
+        screen_cache.move_to_end(lines)
+    game_window.blit(screen, (0, 0))
+
+class SceneManager:
+    """Stack of scenes (menu, game, pause, ...); the scene on top receives input and draws each frame.
+
+    Moving between screens only changes this stack, so the call stack stays flat, and a scene that
+    is removed (like a finished game) is freed along with everything it holds.
+    """
+
+    def __init__(self, scene):
+        """Start with a single scene."""
+        self.stack = [scene]
+        scene.enter()
+
+    @property
+    def scene(self):
+        """The scene on top of the stack (None once the game has been quit)."""
+        return self.stack[-1] if self.stack else None
+
+    def push(self, scene):
+        """Show a scene on top of the current one (which resumes when it is popped)."""
+        self.stack.append(scene)
+        scene.enter()
+
+    def pop(self):
+        """Close the top scene and go back to the one below."""
+        self.stack.pop()
+        if self.stack:
+            self.stack[-1].enter()
+
+    def replace(self, scene):
+        """Swap the top scene for another one."""
+        self.stack[-1] = scene
+        scene.enter()
+
+    def reset(self, scene):
+        """Close every scene and start again from a single one."""
+        self.stack = [scene]
+        scene.enter()
+
+    def quit(self):
+        """Close every scene, which ends the main loop."""
+        self.stack = []
+
+class Scene:
+    """One screen of the game, driven a frame at a time by run()."""
+    frame_rate = 15  # Frames per second while this scene is showing
+
+    def enter(self):
+        """Called whenever the scene comes to the top of the stack."""
+
+    def handle_event(self, event, scenes):
+        """React to an input event (scenes is the SceneManager, for moving to other screens)."""
+
+    def update(self, elapsed, scenes):
+        """Advance the scene by elapsed milliseconds."""
+
+    def draw(self):
+        """Draw the scene."""
+
+class StaticScene(Scene):
+    """A screen of fixed text (menus and information pages), given as draw_static_screen lines."""
+    lines = ()
+
+    def draw(self):
+        """Draw the screen of text."""
+        draw_static_screen(self.lines)
+        profiler.mark('draw')
         pygame.display.update()
-
-        # Event handling for the high score screen
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
+        profiler.mark('display_update')
+
+class MenuScene(StaticScene):
+    """The main menu."""
+
+    def enter(self):
+        """Lay out the game title and menu options (which show the current rule profile)."""
+        self.lines = (
+            ("Snake Game", green, -130, menu_font),
+            ("Press P to Play", white, -90, pause_font),
+            ("Press H for High Score", white, -50, pause_font),
+            ("Press L to Play a Large World", white, -10, pause_font),
+            ("Press I for Game Info", white, 30, pause_font),
+            ("Press D to Watch a Demo", white, 70, pause_font),
+            (f"Press R to Change Rules: {rules.name}", white, 110, pause_font),
+            ("Press Q to Quit", white, 150, pause_font),
+        )
+
+    def next_profile(self):
+        """Switch to the next rule profile that loads (profiles with mistakes are skipped)."""
+        names = profile_names()
+        index = names.index(rules.name) if rules.name in names else -1
+        for offset in range(1, len(names) + 1):
+            try:
+                select_profile(load_profile(names[(index + offset) % len(names)]))
+                break
+            except ValueError:
+                continue
+        self.enter()
+
+    def handle_event(self, event, scenes):
+        """Handle the main menu keys."""
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_p:
+                # Start the game
+                scenes.replace(PlayScene())
+            elif event.key == pygame.K_q:
                 # Quit the game
-                showing = False
-                pygame.quit()
-                quit()
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_b:
-                    # Go back to main menu
-                    showing = False
-                    main_menu()
-
-        # Control the frame rate of the high score screen
-        clock.tick(15)
-
-def show_game_info():
-    """Function to display game information."""
-    info = True  # Flag to keep the game info screen running
+                scenes.quit()
+            elif event.key == pygame.K_l:
+                # Start a game on a large scrolling board
+                scenes.replace(PlayScene(large_world=True))
+            elif event.key == pygame.K_h:
+                # Show high score
+                scenes.push(HighScoreScene())
+            elif event.key == pygame.K_i:
+                # Show game information
+                scenes.push(GameInfoScene())
+            elif event.key == pygame.K_d:
+                # Let the autopilot play (the arrow keys take over)
+                scenes.replace(PlayScene(demo=True))
+            elif event.key == pygame.K_r:
+                # Play by a different rule profile
+                self.next_profile()
+
+class HighScoreScene(StaticScene):
+    """The high score and the best games on the leaderboard."""
+
+    def __init__(self):
+        """Lay out the scores as they are when the screen opens."""
+        lines = [
+            ("High Score", green, -150, menu_font),
+            (str(scores.high_score), white, -105, menu_font),
+        ]
+        # List the best games on the leaderboard with their dates
+        for rank, entry in enumerate(scores.leaderboard[:5], start=1):
+            date = time.strftime('%Y-%m-%d', time.localtime(entry['date']))
+            lines.append((f"{rank}. {entry['score']}   {date}", white, -55 + 30 * rank, pause_font))
+        lines.append(("Press B to go back", white, 170, pause_font))
+        self.lines = tuple(lines)
+
+    def handle_event(self, event, scenes):
+        """Go back to the main menu on B."""
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_b:
+            scenes.pop()
+
+def game_info_screen():
+    """Return the lines of the game information screen, ready for draw_static_screen."""
     # List of strings containing the game information
     lines = [
         "Game Information:",
@@ -496,33 +661,249 @@ def show_game_info():
         "",
         "Press 'B' to return to the main menu.",
     ]
-    while info:
-        # Fill the screen with black color
-        game_window.fill(black)
-        y_offset = -220  # Starting vertical offset for displaying text
-        # Iterate through the lines and display them on the screen
-        for line in lines:
-            message_center(line, white, y_offset, info_font)
-            y_offset += 20  # Increment the vertical offset for the next line
+    # Lay the lines out top to bottom, starting 220 pixels above the center, 20 pixels apart
+    return tuple((line, white, -220 + 20 * i, info_font) for i, line in enumerate(lines))
+
+class GameInfoScene(StaticScene):
+    """The game information page."""
+    lines = game_info_screen()
+
+    def handle_event(self, event, scenes):
+        """Go back to the main menu on B."""
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_b:
+            scenes.pop()
+
+class PauseScene(StaticScene):
+    """The pause menu, shown on top of a game."""
+
+    def __init__(self, current_score, high_score, large_world=False):
+        """Show the score of the paused game (large_world is kept so a restart uses the same board)."""
+        self.large_world = large_world
+        # Pause menu options
+        self.lines = (
+            ("Game Paused", white, -100, menu_font),
+            (f"Score: {current_score}", white, -50, pause_font),
+            (f"High Score: {high_score}", white, -20, pause_font),
+            ("Press R to Resume", white, 20, pause_font),
+            ("Press C to Restart", white, 60, pause_font),
+            ("Press M for Main Menu", white, 100, pause_font),
+            ("Press Q to Quit", white, 140, pause_font),
+        )
+
+    def handle_event(self, event, scenes):
+        """Handle the pause menu keys."""
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_r:
+                # Resume the game
+                scenes.pop()
+            elif event.key == pygame.K_c:
+                # Restart the game (the paused game is dropped)
+                scenes.reset(PlayScene(self.large_world))
+            elif event.key == pygame.K_m:
+                # Go back to main menu
+                scenes.reset(MenuScene())
+            elif event.key == pygame.K_q:
+                # Quit the game
+                scenes.quit()
+
+class GameOverScene(Scene):
+    """The game over screen, showing the final score."""
+    frame_rate = frame_rate
+
+    def __init__(self, score, won, large_world=False):
+        """Show the result of a finished game (large_world is kept so Play Again uses the same board)."""
+        self.score = score
+        self.large_world = large_world
+        # Display game over messages
+        if won:
+            title = ("You Won!", green, -50, menu_font)
+        else:
+            title = ("You Lost!", red, -50, menu_font)
+        self.lines = (title, ("Press C-Play Again, M-Main Menu, or Q-Quit", white, 10, font_style))
 
+    def handle_event(self, event, scenes):
+        """Handle the game over keys."""
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_q:
+                # Quit the game
+                scenes.quit()
+            elif event.key == pygame.K_c:
+                # Restart the game
+                scenes.replace(PlayScene(self.large_world))
+            elif event.key == pygame.K_m:
+                # Go back to main menu
+                scenes.replace(MenuScene())
+
+    def draw(self):
+        """Draw the game over messages with the current score and high score."""
+        draw_static_screen(self.lines)
+        display_score(self.score, scores.high_score)
         pygame.display.update()
 
-        # Event handling for the game info screen
+class PlayScene(Scene):
+    """A game being played (on a huge scrolling board if large_world is set, or by the autopilot if demo is set)."""
+    frame_rate = frame_rate
+
+    def __init__(self, large_world=False, demo=False):
+        """Start a new game."""
+        self.large_world = large_world
+        self.demo = demo
+
+        # Create a new game (the rules live in the headless simulation core)
+        if large_world:
+            # Always random obstacles: levels aren't generated for a board this big
+            self.game = SnakeGame(large_world_cols * snake_block, large_world_rows * snake_block, large_world_obstacles,
+                                  rules=rules, obstacle_layout='random')
+        else:
+            self.game = new_game()
+
+        # Record the game so it can be replayed (for example in a bug report)
+        self.recorder = ReplayRecorder(self.game)
+
+        # Only the cells that change each tick are redrawn (or, on a large board, only the cells in view)
+        if large_world:
+            self.renderer = ViewportRenderer(self.game)
+        else:
+            self.renderer = BoardRenderer(self.game)
+
+        # In demo mode the autopilot steers until the player presses an arrow key
+        self.autopilot = Autopilot(self.game) if demo else None
+
+        # Let the profiler time the phases of each simulation tick
+        self.game.profiler = profiler
+        self.overlay = None  # Profiler overlay text (None while the overlay is off)
+
+        # Fixed-timestep loop: the snake moves every 1000 / snake_speed milliseconds, while
+        # input and drawing happen every frame, so the game stays responsive at any speed
+        self.turn_queue = deque()  # Direction changes waiting to be applied, one per move
+        self.accumulator = 0       # Milliseconds of game time not yet simulated
+
+    def enter(self):
+        """Repaint the whole board, since another screen may have drawn over it."""
+        self.renderer.invalidate()
+
+    def handle_event(self, event, scenes):
+        """Handle the gameplay keys."""
+        if event.type == pygame.KEYDOWN:
+            # Movement controls (buffered until the next move)
+            if event.key in direction_keys:
+                self.autopilot = None
+                queue_turn(self.turn_queue, direction_keys[event.key], self.game)
+            elif event.key == pygame.K_p:
+                # Pause the game
+                scenes.push(PauseScene(self.game.score, scores.high_score, self.large_world))
+            elif event.key == pygame.K_F3:
+                # Show or hide the performance overlay
+                profiler.toggle()
+            elif event.key == pygame.K_F4:
+                # Save the recorded frame timings as a Chrome trace
+                profiler.export_chrome_trace(profile_trace_file)
+
+    def update(self, elapsed, scenes):
+        """Advance the simulation by as many moves as the elapsed time allows."""
+        game = self.game
+        self.accumulator += elapsed
+        steps = 0
+        while self.accumulator >= 1000 / game.snake_speed and not game.game_close:
+            self.accumulator -= 1000 / game.snake_speed
+            if self.autopilot is not None:
+                self.recorder.step(self.autopilot.choose())
+            else:
+                self.recorder.step(self.turn_queue.popleft() if self.turn_queue else None)
+            steps += 1
+            if steps == max_steps_per_frame:
+                # Drop the remaining backlog instead of freezing to catch up
+                self.accumulator = 0
+        profiler.mark('simulation')
+
+        # Save the replay, record the score (unless it was a demo) and show the game over screen as soon as the game ends
+        if game.game_close:
+            self.recorder.save(replay_file)
+            if not self.demo:
+                scores.record_game(game.score, game.seed, game.tick)
+            scenes.replace(GameOverScene(game.score, game.won, self.large_world))
+            return
+
+        # Refresh the overlay figures a few times a second
+        if not profiler.enabled:
+            self.overlay = None
+        elif self.overlay is None or profiler.frame_count % 15 == 0:
+            self.overlay = tuple(f"{name}: p50 {p50:.2f} ms, p99 {p99:.2f} ms"
+                                 for name, p50, p99 in profiler.summary())
+
+    def draw(self):
+        """Draw the cells that changed (and the score if it changed)."""
+        self.renderer.draw(scores.high_score, self.overlay)
+
+def run(scene, max_frames=None):
+    """Main loop: run scenes, starting from the given one, until the game is quit (or after max_frames frames)."""
+    setup()
+    scenes = SceneManager(scene)
+    current = None  # Scene shown on the previous frame
+    elapsed = 0     # Milliseconds since the previous frame
+    frames = 0
+
+    # Create a clock object to control the frame rate
+    clock = pygame.time.Clock()
+
+    while scenes.scene is not None and frames != max_frames:
+        frames += 1
+        profiler.begin_frame()
+
+        # Event handling (events after a change of screen go to the new screen)
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 # Quit the game
-                info = False
-                pygame.quit()
-                quit()
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_b:
-                    # Go back to main menu
-                    info = False
-                    main_menu()
-
-        # Control the frame rate of the game info screen
-        clock.tick(15)
-
-# Start the game by calling the main menu function
-main_menu()
+                scenes.quit()
+            if scenes.scene is None:
+                break
+            scenes.scene.handle_event(event, scenes)
+        profiler.mark('events')
+        if scenes.scene is None:
+            break
+
+        # Time spent on other screens doesn't count towards a scene that has just come to the top
+        if scenes.scene is not current:
+            current = scenes.scene
+            elapsed = 0
+        scenes.scene.update(elapsed, scenes)
+
+        # Draw the scene on top (which may have just changed) and control the frame rate
+        scenes.scene.draw()
+        elapsed = clock.tick(scenes.scene.frame_rate)
+        profiler.mark('sleep')
+        profiler.end_frame()
+
+    # Close the window (and stop generating levels)
+    if level_prefetcher is not None:
+        level_prefetcher.close()
+    pygame.quit()
 
+def main(argv=None):
+    """Command line entry point: start the game at the main menu (or straight into a game)."""
+    parser = argparse.ArgumentParser(description='Play Snake.')
+    parser.add_argument('--large-world', action='store_true', help='start a large-world game instead of the menu')
+    parser.add_argument('--demo', action='store_true', help='start a game played by the autopilot instead of the menu')
+    parser.add_argument('--headless', action='store_true',
+                        help='run without a window (implies --demo, and stops after 600 frames unless --frames is given)')
+    parser.add_argument('--frames', type=int, default=None, help='quit after this many frames')
+    parser.add_argument('--profile', default=default_rules.name,
+                        help=f"rule profile to play by, a name or file (available: {', '.join(profile_names())})")
+    args = parser.parse_args(argv)
+
+    try:
+        select_profile(load_profile(args.profile))
+    except ValueError as error:
+        parser.error(str(error))
+    setup(args.headless)
+    if args.demo or args.headless or args.large_world:
+        scene = PlayScene(args.large_world, demo=args.demo or args.headless)
+    else:
+        scene = MenuScene()
+    frames = args.frames
+    if frames is None and args.headless:
+        frames = 600
+    run(scene, frames)
+
+if __name__ == '__main__':
+    main()
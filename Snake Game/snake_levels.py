@@ -0,0 +1,261 @@
+# Procedural obstacle layouts for the Snake Game
+# Builds maze, room and scatter levels at a target obstacle density. After a layout is built, a flood
+# fill from the snake's starting cell finds any empty cells the snake could never reach (pockets sealed
+# off by obstacles) and fills them in, so every empty cell on the board is connected and food can
+# always be reached. Levels are fully determined by their seed, so a replay regenerates the same level.
+#
+# LevelPrefetcher generates levels in a background process and keeps the next one ready, so starting
+# a new game never waits for level generation.
+
+import random       # For random number generation (each level has its own seeded generator)
+
+# Cells within this many steps of the starting cell are always left empty
+clear_radius = 2
+
+# Maze corridors are this many cells wide, with walls one cell thick between them
+maze_corridor = 2
+
+# Rooms are this many cells across (including the wall on one side), with doors this wide
+room_width = 12
+room_height = 10
+door_width = 3
+extra_door_chance = 0.3  # Chance of a door between rooms that are already connected (makes loops)
+
+
+def start_cell(cols, rows):
+    """Return the cell the snake starts on (the center of the board, as in SnakeGame)."""
+    return (rows // 2) * cols + cols // 2
+
+
+def build_scatter(grid, cols, rows, rng):
+    """Scatter layout: nothing to build, the obstacles are all added when the density is adjusted."""
+
+
+def build_maze(grid, cols, rows, rng):
+    """Maze layout: corridors maze_corridor cells wide, carved out of solid walls by a randomized depth-first search."""
+    block = maze_corridor + 1
+    # Maze cells cut short by the edge of the board still count
+    maze_cols = (cols + maze_corridor) // block
+    maze_rows = (rows + maze_corridor) // block
+
+    # Start with every wall line in place: the last cell of each block, across and down
+    for y in range(rows):
+        row = y * cols
+        if y % block == maze_corridor:
+            grid[row:row + cols] = b'\x01' * cols
+        else:
+            for x in range(maze_corridor, cols, block):
+                grid[row + x] = 1
+
+    def open_passage(x, y, dx, dy):
+        """Knock out the wall between maze cell (x, y) and its neighbour in direction (dx, dy)."""
+        if dx:
+            wall_x = x * block + maze_corridor if dx > 0 else x * block - 1
+            for wall_y in range(y * block, min(rows, y * block + maze_corridor)):
+                grid[wall_y * cols + wall_x] = 0
+        else:
+            wall_y = y * block + maze_corridor if dy > 0 else y * block - 1
+            for wall_x in range(x * block, min(cols, x * block + maze_corridor)):
+                grid[wall_y * cols + wall_x] = 0
+
+    # Randomized depth-first search over the maze cells (with an explicit stack, so big mazes don't recurse)
+    visited = bytearray(maze_cols * maze_rows)
+    x, y = rng.randrange(maze_cols), rng.randrange(maze_rows)
+    visited[y * maze_cols + x] = 1
+    stack = [(x, y)]
+    while stack:
+        x, y = stack[-1]
+        options = [(dx, dy) for dx, dy in ((-1, 0), (1, 0), (0, -1), (0, 1))
+                   if 0 <= x + dx < maze_cols and 0 <= y + dy < maze_rows
+                   and not visited[(y + dy) * maze_cols + x + dx]]
+        if not options:
+            stack.pop()
+            continue
+        dx, dy = rng.choice(options)
+        open_passage(x, y, dx, dy)
+        visited[(y + dy) * maze_cols + x + dx] = 1
+        stack.append((x + dx, y + dy))
+
+
+def build_rooms(grid, cols, rows, rng):
+    """Room layout: a grid of rooms separated by walls, joined by doors so that every room can be reached."""
+    room_cols = max(1, cols // room_width)
+    room_rows = max(1, rows // room_height)
+
+    # Walls down the right side and along the bottom of every room but the last in each direction
+    for room_x in range(1, room_cols):
+        x = room_x * room_width - 1
+        for y in range(rows):
+            grid[y * cols + x] = 1
+    for room_y in range(1, room_rows):
+        row = (room_y * room_height - 1) * cols
+        grid[row:row + cols] = b'\x01' * cols
+
+    def open_door(room_x, room_y, dx, dy):
+        """Make a door in the wall between a room and the room to its right (dx) or below it (dy)."""
+        if dx:
+            x = (room_x + 1) * room_width - 1
+            top = room_y * room_height
+            y = rng.randrange(top, max(top + 1, top + room_height - 1 - door_width))
+            for offset in range(door_width):
+                if y + offset < rows:
+                    grid[(y + offset) * cols + x] = 0
+        else:
+            y = (room_y + 1) * room_height - 1
+            left = room_x * room_width
+            x = rng.randrange(left, max(left + 1, left + room_width - 1 - door_width))
+            for offset in range(door_width):
+                if x + offset < cols:
+                    grid[y * cols + x + offset] = 0
+
+    # Going through the walls between rooms in random order, a door goes in wherever it joins two groups
+    # of rooms that were not connected yet (so every room can be reached), and sometimes elsewhere (making loops)
+    walls = [(room_x, room_y, dx, dy) for room_x in range(room_cols) for room_y in range(room_rows)
+             for dx, dy in ((1, 0), (0, 1)) if room_x + dx < room_cols and room_y + dy < room_rows]
+    rng.shuffle(walls)
+    group = {(room_x, room_y): (room_x, room_y) for room_x in range(room_cols) for room_y in range(room_rows)}
+
+    def find(room):
+        """Return the representative room of a room's group."""
+        while group[room] != room:
+            group[room] = group[group[room]]
+            room = group[room]
+        return room
+
+    for room_x, room_y, dx, dy in walls:
+        first = find((room_x, room_y))
+        second = find((room_x + dx, room_y + dy))
+        if first != second:
+            group[first] = second
+            open_door(room_x, room_y, dx, dy)
+        elif rng.random() < extra_door_chance:
+            open_door(room_x, room_y, dx, dy)
+
+
+# Level layouts by name
+layouts = {
+    'maze': build_maze,
+    'rooms': build_rooms,
+    'scatter': build_scatter,
+}
+
+
+def reachable_cells(blocked, cols, rows, start):
+    """Flood fill from start through unblocked cells; return a bytearray with 1 for every cell reached."""
+    size = cols * rows
+    reached = bytearray(size)
+    reached[start] = 1
+    frontier = [start]
+    while frontier:
+        next_frontier = []
+        for cell in frontier:
+            x = cell % cols
+            for neighbour in (cell - 1 if x else -1, cell + 1 if x < cols - 1 else -1, cell - cols, cell + cols):
+                if 0 <= neighbour < size and not reached[neighbour] and not blocked[neighbour]:
+                    reached[neighbour] = 1
+                    next_frontier.append(neighbour)
+        frontier = next_frontier
+    return reached
+
+
+def can_block(blocked, cols, rows, cell):
+    """Check that blocking a cell can't cut any empty cells off from each other.
+
+    Walking round the eight cells surrounding it, each pair of neighbours in turn share an edge, so
+    the empty ones form runs of connected cells. If every empty cell next to the blocked one (above,
+    below, left or right) is in the same run, any path through the cell can go round it instead.
+    """
+    y, x = divmod(cell, cols)
+    ring = []
+    for dx, dy in ((0, -1), (1, -1), (1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1)):
+        ring.append(0 <= x + dx < cols and 0 <= y + dy < rows and not blocked[cell + dy * cols + dx])
+    runs = 0
+    for i in range(0, 8, 2):
+        # Count the runs by their first side cell: an empty side cell not joined to the side cell before it
+        if ring[i] and not (ring[i - 1] and ring[i - 2]):
+            runs += 1
+    return runs <= 1
+
+
+def generate_level(cols, rows, layout, density, seed, wall_mask=None):
+    """Return the sorted obstacle cells of a new level (leaving out the fixed walls in wall_mask).
+
+    The layout's obstacles are thinned out or topped up with scattered ones until they cover
+    density of the board, then any empty cells cut off from the starting cell are filled in.
+    """
+    rng = random.Random(seed)
+    size = cols * rows
+    walls = bytearray(size) if wall_mask is None else wall_mask
+    grid = bytearray(size)  # 1 where the level has an obstacle
+    layouts[layout](grid, cols, rows, rng)
+
+    # Keep the area around the snake's starting cell empty
+    start = start_cell(cols, rows)
+    start_y, start_x = divmod(start, cols)
+    clear = set()
+    for y in range(max(0, start_y - clear_radius), min(rows, start_y + clear_radius + 1)):
+        for x in range(max(0, start_x - clear_radius), min(cols, start_x + clear_radius + 1)):
+            clear.add(y * cols + x)
+            grid[y * cols + x] = 0
+
+    # Bring the number of obstacles to the target density
+    obstacles = [cell for cell in range(size) if grid[cell] and not walls[cell]]
+    target = int(density * size)
+    if len(obstacles) > target:
+        # Knocking out obstacles never cuts anything off, so any can go
+        rng.shuffle(obstacles)
+        for cell in obstacles[target:]:
+            grid[cell] = 0
+        del obstacles[target:]
+    blocked = bytearray(size)
+    for cell in range(size):
+        blocked[cell] = grid[cell] | walls[cell]
+    if len(obstacles) < target:
+        # Add obstacles on random empty cells, skipping any that would cut the empty cells around them apart
+        empty = [cell for cell in range(size) if not blocked[cell] and cell not in clear]
+        rng.shuffle(empty)
+        for cell in empty:
+            if len(obstacles) >= target:
+                break
+            if can_block(blocked, cols, rows, cell):
+                blocked[cell] = 1
+                obstacles.append(cell)
+
+    # Fill in every empty cell the snake could never reach from its starting cell
+    reached = reachable_cells(blocked, cols, rows, start)
+    for cell in range(size):
+        if not reached[cell] and not blocked[cell]:
+            obstacles.append(cell)
+    obstacles.sort()
+    return obstacles
+
+
+class LevelPrefetcher:
+    """Generates levels for one board in a background process, always keeping the next level ready."""
+
+    def __init__(self, cols, rows, layout, density, wall_mask=None):
+        """Start generating the first level."""
+        # Imported here, so that importing this module (and the engine) stays fast
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        self.settings = (cols, rows, layout, density, None if wall_mask is None else bytes(wall_mask))
+        # A freshly started process (rather than a copy of this one) doesn't inherit the window or any threads
+        self.pool = ProcessPoolExecutor(1, mp_context=multiprocessing.get_context('spawn'))
+        self.pending = self.submit()
+
+    def submit(self):
+        """Start generating a level with a new random seed; return the seed and the future result."""
+        seed = random.getrandbits(64)
+        return seed, self.pool.submit(generate_level, *self.settings[:4], seed, self.settings[4])
+
+    def next_level(self):
+        """Return (seed, obstacle cells) of the prefetched level, and start generating the one after it."""
+        seed, future = self.pending
+        obstacles = future.result()
+        self.pending = self.submit()
+        return seed, obstacles
+
+    def close(self):
+        """Stop the background process, dropping any level still being generated."""
+        self.pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,79 @@
+# Frame profiler for the Snake Game
+# Times each phase of a frame (input, simulation, drawing, display update, sleeping) with lap timers,
+# keeps recent history for p50/p99 figures shown in an overlay, and exports a Chrome trace
+# (open it at chrome://tracing or https://ui.perfetto.dev). While disabled every call returns immediately.
+
+import json         # For writing the trace file
+from collections import deque  # Fixed-size history of recent frames
+from time import perf_counter_ns  # High resolution timer
+
+
+class Profiler:
+    """Lap timer recording how long each phase of every frame takes."""
+
+    def __init__(self, history=600, trace_size=200000):
+        """Create a disabled profiler keeping history frames of statistics and trace_size trace events."""
+        self.enabled = False
+        self.history = history
+        self.frame_times = deque(maxlen=history)  # Recent frame durations (nanoseconds)
+        self.phase_times = {}                     # Recent durations of each phase, by name
+        self.current = {}                         # Time spent in each phase during the current frame
+        self.trace = deque(maxlen=trace_size)     # (name, start, duration) events for the trace export
+        self.frame_count = 0                      # Frames profiled so far
+        self.frame_start = 0
+        self.last_mark = 0
+
+    def toggle(self):
+        """Switch profiling on or off, starting the timers from now."""
+        self.enabled = not self.enabled
+        self.current.clear()
+        self.frame_start = self.last_mark = perf_counter_ns()
+
+    def begin_frame(self):
+        """Start timing a new frame."""
+        if not self.enabled:
+            return
+        self.frame_start = self.last_mark = perf_counter_ns()
+
+    def mark(self, name):
+        """Charge the time since the previous mark to the named phase."""
+        if not self.enabled:
+            return
+        now = perf_counter_ns()
+        duration = now - self.last_mark
+        self.current[name] = self.current.get(name, 0) + duration
+        self.trace.append((name, self.last_mark, duration))
+        self.last_mark = now
+
+    def end_frame(self):
+        """Finish the current frame and add its timings to the history."""
+        if not self.enabled:
+            return
+        now = perf_counter_ns()
+        self.frame_count += 1
+        self.frame_times.append(now - self.frame_start)
+        self.trace.append(('frame', self.frame_start, now - self.frame_start))
+        for name, duration in self.current.items():
+            if name not in self.phase_times:
+                self.phase_times[name] = deque(maxlen=self.history)
+            self.phase_times[name].append(duration)
+        self.current.clear()
+
+    def summary(self):
+        """Return (name, p50 ms, p99 ms) for the whole frame and each phase over the recent history."""
+        rows = []
+        for name, times in [('frame', self.frame_times)] + list(self.phase_times.items()):
+            if not times:
+                continue
+            ordered = sorted(times)
+            p50 = ordered[len(ordered) // 2]
+            p99 = ordered[min(len(ordered) - 1, len(ordered) * 99 // 100)]
+            rows.append((name, p50 / 1e6, p99 / 1e6))
+        return rows
+
+    def export_chrome_trace(self, path):
+        """Write the recorded events as a Chrome trace (JSON) file."""
+        events = [{'name': name, 'ph': 'X', 'ts': start / 1000, 'dur': duration / 1000, 'pid': 0, 'tid': 0}
+                  for name, start, duration in self.trace]
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
@@ -0,0 +1,101 @@
+# Rule profiles for the Snake Game
+# A profile is a JSON or TOML file whose settings replace some of the defaults in snake_engine
+# (board size, block size, speeds, obstacles, fixed walls and power-ups). Loading a profile compiles
+# it into a snake_engine.Rules object, whose lookup tables are then shared by every game using it.
+#
+# Settings (any left out keep their default):
+#   width, height, snake_block          board size in pixels and the size of one block
+#   base_snake_speed, max_snake_speed,  speeds in moves per second; the snake speeds up by one
+#   min_snake_speed, speed_up_every     each time the score reaches a multiple of speed_up_every
+#   num_obstacles                       randomly placed obstacles
+#   obstacle_layout, obstacle_density   'random' (num_obstacles on random cells), or a generated 'maze',
+#                                       'rooms' or 'scatter' level covering obstacle_density of the board
+#   walls                               fixed obstacles as [x, y, width, height] rectangles of cells
+#   power_up_types                      replaces the whole table (same layout as in snake_engine)
+#   first_power_up_delay, power_up_delay  [min, max] ticks before a power-up appears
+#
+# Usage: python snake_profiles.py   (lists the available profiles)
+
+import json         # For JSON profiles
+import os           # For operating system interactions (file paths)
+
+try:
+    import tomllib  # For TOML profiles (Python 3.11 and later)
+except ImportError:
+    tomllib = None
+
+from snake_engine import Rules, default_rules
+
+# Profiles shipped with the game, next to this script
+profile_directory = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'profiles')
+profile_extensions = ('.json', '.toml')
+
+# Settings a profile may contain (the keyword arguments of Rules)
+profile_settings = ('width', 'height', 'snake_block', 'base_snake_speed', 'max_snake_speed', 'min_snake_speed',
+                    'speed_up_every', 'num_obstacles', 'obstacle_layout', 'obstacle_density', 'walls',
+                    'power_up_types', 'first_power_up_delay', 'power_up_delay')
+
+# Rules already loaded, by profile name (so their tables are only built once)
+loaded_profiles = {default_rules.name: default_rules}
+
+
+def profile_names():
+    """Return the names of the available profiles, the default first."""
+    names = []
+    if os.path.isdir(profile_directory):
+        for file_name in os.listdir(profile_directory):
+            name, extension = os.path.splitext(file_name)
+            if extension in profile_extensions and name != default_rules.name:
+                names.append(name)
+    return [default_rules.name] + sorted(set(names))
+
+
+def find_profile(name):
+    """Return the file holding a profile, given its name or a path to the file."""
+    if os.path.isfile(name):
+        return name
+    for extension in profile_extensions:
+        path = os.path.join(profile_directory, name + extension)
+        if os.path.isfile(path):
+            return path
+    raise ValueError(f"no profile called {name!r} (available: {', '.join(profile_names())})")
+
+
+def read_settings(path):
+    """Read the settings from a JSON or TOML profile file."""
+    if path.endswith('.toml'):
+        if tomllib is None:
+            raise ValueError("TOML profiles need Python 3.11 or later (use a JSON profile instead)")
+        with open(path, 'rb') as f:
+            settings = tomllib.load(f)
+    else:
+        with open(path, 'r') as f:
+            settings = json.load(f)
+    if not isinstance(settings, dict):
+        raise ValueError(f"{path}: a profile must be a table of settings")
+    unknown = sorted(set(settings) - set(profile_settings))
+    if unknown:
+        raise ValueError(f"{path}: unknown settings {', '.join(unknown)}")
+    return settings
+
+
+def load_profile(name):
+    """Return the compiled Rules for a profile name (or path to a profile file)."""
+    rules = loaded_profiles.get(name)
+    if rules is None:
+        path = find_profile(name)
+        try:
+            rules = Rules(name, **read_settings(path))
+        except (TypeError, KeyError, ValueError) as error:
+            raise ValueError(f"{path}: {error}") from error
+        loaded_profiles[name] = rules
+    return rules
+
+
+if __name__ == '__main__':
+    for name in profile_names():
+        rules = load_profile(name)
+        print(f"{name}: {rules.width // rules.snake_block} x {rules.height // rules.snake_block} cells, "
+              f"speed {rules.base_snake_speed}-{rules.max_snake_speed}, "
+              f"{rules.num_obstacles if rules.obstacle_layout == 'random' else rules.obstacle_layout} obstacles, "
+              f"{len(rules.walls)} walls, {len(rules.power_up_types)} power-ups")
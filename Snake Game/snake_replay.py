@@ -0,0 +1,146 @@
+# Compact replay recording for the Snake Game
+# A game is fully determined by its seed, its board settings, its rule profile and the ticks at which the
+# snake turned, so a replay stores just those and re-simulates the game with the headless engine (much faster
+# than real time).
+#
+# File layout (all numbers are unsigned LEB128 varints):
+#   b'SNKR', version, seed, cols, rows, number of random obstacles (not counting the profile's walls),
+#   length of the profile name, profile name (UTF-8),
+#   length of the obstacle layout name, obstacle layout name (UTF-8)
+#   one varint per turn: (ticks since the previous turn << 2) | direction code
+#   0, then the total number of ticks played
+#
+# Usage: python snake_replay.py last_game.replay
+
+import sys          # For command line arguments
+
+from snake_engine import SnakeGame, directions
+from snake_profiles import load_profile
+
+# File signature and format version
+magic = b'SNKR'
+version = 1
+
+# Direction codes stored in the file (their order in snake_engine.directions)
+direction_names = list(directions.keys())
+direction_codes = {directions[name]: code for code, name in enumerate(direction_names)}
+
+
+def write_varint(out, value):
+    """Append an unsigned integer to a bytearray, seven bits per byte."""
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def read_varint(data, pos):
+    """Read an unsigned integer from data at pos, returning the value and the next position."""
+    value = 0
+    shift = 0
+    while True:
+        if pos >= len(data):
+            raise ValueError("replay data ends in the middle of a number")
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+class ReplayRecorder:
+    """Steps a game and records every change of direction."""
+
+    def __init__(self, game):
+        """Start recording a new game (before its first step)."""
+        self.game = game
+        self.turns = bytearray()
+        self.last_turn_tick = 0
+
+    def step(self, action=None):
+        """Advance the game by one tick (like SnakeGame.step), recording the turn if the snake changed direction."""
+        game = self.game
+        before = (game.x1_change, game.y1_change)
+        alive = game.step(action)
+        after = (game.x1_change, game.y1_change)
+        if after != before:
+            write_varint(self.turns, (game.tick - self.last_turn_tick) << 2 | direction_codes[after])
+            self.last_turn_tick = game.tick
+        return alive
+
+    def to_bytes(self):
+        """Return the replay of the game so far."""
+        game = self.game
+        data = bytearray(magic)
+        walls = game.rules.board(game.cols, game.rows).walls
+        for value in (version, game.seed, game.cols, game.rows, len(game.obstacles) - len(walls)):
+            write_varint(data, value)
+        for name in (game.rules.name, game.obstacle_layout):
+            encoded = name.encode('utf-8')
+            write_varint(data, len(encoded))
+            data += encoded
+        data += self.turns
+        write_varint(data, 0)
+        write_varint(data, game.tick)
+        return bytes(data)
+
+    def save(self, path):
+        """Write the replay to a file."""
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+
+
+def replay(data):
+    """Re-simulate the game stored in replay data and return the finished SnakeGame."""
+    if data[:4] != magic:
+        raise ValueError("not a Snake replay")
+    pos = 4
+    file_version, pos = read_varint(data, pos)
+    if file_version != version:
+        raise ValueError(f"unsupported replay version {file_version}")
+    seed, pos = read_varint(data, pos)
+    cols, pos = read_varint(data, pos)
+    rows, pos = read_varint(data, pos)
+    obstacles, pos = read_varint(data, pos)
+    length, pos = read_varint(data, pos)
+    rules = load_profile(data[pos:pos + length].decode('utf-8'))
+    pos += length
+    length, pos = read_varint(data, pos)
+    layout = data[pos:pos + length].decode('utf-8')
+    pos += length
+
+    game = SnakeGame(cols * rules.snake_block, rows * rules.snake_block, obstacles, seed=seed, rules=rules,
+                     obstacle_layout=layout)
+    step = game.step
+    while True:
+        value, pos = read_varint(data, pos)
+        if value == 0:
+            break
+        # Run straight on until the tick of the next turn, then turn (a game that ends
+        # before then doesn't match the recording, for example after a profile was edited)
+        turn_tick = game.tick + (value >> 2)
+        while game.tick < turn_tick - 1 and step():
+            pass
+        if game.game_close:
+            raise ValueError(f"replay diverged: the game ended at tick {game.tick}, before a turn at tick {turn_tick}")
+        step(direction_names[value & 3])
+    total_ticks, pos = read_varint(data, pos)
+    while game.tick < total_ticks and step():
+        pass
+    if game.tick < total_ticks:
+        raise ValueError(f"replay diverged: the game ended at tick {game.tick} of {total_ticks}")
+    return game
+
+
+def load_replay(path):
+    """Re-simulate the game stored in a replay file."""
+    with open(path, 'rb') as f:
+        return replay(f.read())
+
+
+if __name__ == '__main__':
+    for replay_file in sys.argv[1:]:
+        game = load_replay(replay_file)
+        print(f"{replay_file}: seed {game.seed}, {game.tick} ticks, score {game.score}, "
+              f"ended by {'a win' if game.won else game.death_cause or 'quitting'}")
@@ -0,0 +1,172 @@
+# High score and leaderboard storage for the Snake Game
+# Scores are kept in memory, so looking them up costs nothing per frame. Files are written by a background
+# thread: the high score is replaced atomically (write a temporary file, then rename it over the old one),
+# and every finished game is appended to a leaderboard file of fixed-size records, so a crash halfway
+# through a write can never lose the saved record.
+
+import atexit       # For flushing pending writes when the program exits
+import logging      # For reporting unreadable score files
+import os           # For operating system interactions (file paths, atomic renames)
+import queue        # For handing writes to the background thread
+import struct       # For the fixed-size leaderboard records
+import threading    # For the background writer
+import time         # For timestamping leaderboard entries
+
+# Score files live next to this script, wherever the game is started from
+score_directory = os.path.dirname(os.path.abspath(__file__))
+
+# Leaderboard file layout: an 8-byte header, then one record per finished game
+leaderboard_header = b'SNKL\x01\x00\x00\x00'
+record_format = struct.Struct('<IIQQ')  # score, ticks played, seed, unix time when the game ended
+
+logger = logging.getLogger(__name__)
+
+
+class ScoreStore:
+    """Cached high score and top-N leaderboard, persisted by a background writer thread."""
+
+    def __init__(self, directory=score_directory, leaderboard_size=10):
+        """Load the saved scores from a directory and start the writer thread."""
+        self.high_score_file = os.path.join(directory, 'high_score.txt')
+        self.leaderboard_file = os.path.join(directory, 'leaderboard.dat')
+        self.leaderboard_size = leaderboard_size
+
+        # Load the leaderboard first, so it can stand in for a damaged high score file
+        self.num_entries = 0
+        self.leaderboard = []  # Best entries, highest score first
+        self.load_leaderboard()
+        self.high_score = max(self.load_high_score(), self.leaderboard[0]['score'] if self.leaderboard else 0)
+
+        # Writes are queued and handled by a background thread, so the game never waits on the disk
+        self.pending = queue.Queue()
+        self.writer = threading.Thread(target=self.write_loop, name='score-writer', daemon=True)
+        self.writer.start()
+        atexit.register(self.close)
+
+    def load_high_score(self):
+        """Read the saved high score, or return 0 if there is none."""
+        if not os.path.exists(self.high_score_file):
+            return 0
+        try:
+            with open(self.high_score_file, 'r', encoding='utf-8') as f:
+                return int(f.read())
+        except (OSError, UnicodeDecodeError, ValueError) as error:
+            # The leaderboard's best score stands in for it
+            logger.warning("Ignoring unreadable high score file %s (%s)", self.high_score_file, error)
+            return 0
+
+    def load_leaderboard(self):
+        """Read every leaderboard record, keeping the best in memory."""
+        if not os.path.exists(self.leaderboard_file):
+            return
+        with open(self.leaderboard_file, 'rb') as f:
+            data = f.read()
+        if data[:len(leaderboard_header)] != leaderboard_header:
+            logger.warning("Ignoring unreadable leaderboard file %s", self.leaderboard_file)
+            return
+        # A record cut short by a crash is left out (and overwritten by the next append)
+        self.num_entries = (len(data) - len(leaderboard_header)) // record_format.size
+        entries = [self.unpack(data, i) for i in range(self.num_entries)]
+        entries.sort(key=lambda entry: entry['score'], reverse=True)
+        self.leaderboard = entries[:self.leaderboard_size]
+
+    def unpack(self, data, index):
+        """Decode leaderboard record number index from the file contents."""
+        offset = len(leaderboard_header) + index * record_format.size
+        score, ticks, seed, date = record_format.unpack_from(data, offset)
+        return {'index': index, 'score': score, 'ticks': ticks, 'seed': seed, 'date': date}
+
+    def entry(self, index):
+        """Read a single leaderboard record straight from the file by its position."""
+        with open(self.leaderboard_file, 'rb') as f:
+            f.seek(len(leaderboard_header) + index * record_format.size)
+            data = f.read(record_format.size)
+        score, ticks, seed, date = record_format.unpack(data)
+        return {'index': index, 'score': score, 'ticks': ticks, 'seed': seed, 'date': date}
+
+    def record_game(self, score, seed, ticks):
+        """Add a finished game to the leaderboard and update the high score (saved in the background)."""
+        entry = {'index': self.num_entries, 'score': score, 'ticks': ticks, 'seed': seed, 'date': int(time.time())}
+        self.num_entries += 1
+
+        # Keep the in-memory top entries in order
+        self.leaderboard.append(entry)
+        self.leaderboard.sort(key=lambda item: item['score'], reverse=True)
+        del self.leaderboard[self.leaderboard_size:]
+
+        new_high_score = score > self.high_score
+        if new_high_score:
+            self.high_score = score
+        self.pending.put((entry, new_high_score))
+
+    def write_loop(self):
+        """Background thread: write queued scores, batching everything that queued up together."""
+        while True:
+            batch = [self.pending.get()]
+            while True:
+                try:
+                    batch.append(self.pending.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self.write_batch([item for item in batch if item is not None])
+            except OSError:
+                logger.exception("Could not save scores")
+            for _ in batch:
+                self.pending.task_done()
+            if None in batch:
+                # close() was called
+                return
+
+    def write_batch(self, batch):
+        """Append a batch of leaderboard records and save the high score if it changed."""
+        if not batch:
+            return
+        try:
+            self.append_records([entry for entry, _ in batch])
+        finally:
+            # The high score is saved even if the leaderboard couldn't be
+            if any(new_high_score for _, new_high_score in batch):
+                self.save_high_score(max(entry['score'] for entry, _ in batch))
+
+    def append_records(self, entries):
+        """Append leaderboard records after the last complete record in the file."""
+        records = b''.join(record_format.pack(entry['score'], entry['ticks'], entry['seed'], entry['date'])
+                           for entry in entries)
+        mode = 'r+b' if os.path.exists(self.leaderboard_file) else 'w+b'
+        with open(self.leaderboard_file, mode) as f:
+            if f.read(len(leaderboard_header)) != leaderboard_header:
+                f.seek(0)
+                f.write(leaderboard_header)
+                f.truncate()
+            # Count the records actually on disk rather than trusting the in-memory count, which runs
+            # ahead of the file if an earlier write failed (and drop any record cut short by a crash)
+            size = f.seek(0, os.SEEK_END)
+            first_index = (size - len(leaderboard_header)) // record_format.size
+            f.seek(len(leaderboard_header) + first_index * record_format.size)
+            f.write(records)
+            f.truncate()
+            f.flush()
+            os.fsync(f.fileno())
+        # Point the entries at where they really ended up
+        for offset, entry in enumerate(entries):
+            entry['index'] = first_index + offset
+
+    def save_high_score(self, score):
+        """Replace the high score file atomically, so it holds either the old or the new score."""
+        temporary_file = self.high_score_file + '.tmp'
+        with open(temporary_file, 'w') as f:
+            f.write(str(score))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary_file, self.high_score_file)
+
+    def flush(self):
+        """Wait until every queued score has been written."""
+        self.pending.join()
+
+    def close(self):
+        """Write any queued scores and stop the writer thread."""
+        if self.writer.is_alive():
+            self.pending.put(None)
+            self.writer.join()
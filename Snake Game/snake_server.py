@@ -0,0 +1,268 @@
+# Multiplayer server for the Snake Game
+# An asyncio process hosting many arenas at once. The server owns the simulation: clients only send
+# turns, and after every tick each client receives the cells that changed (and the players whose
+# state changed) in its arena. All arenas are stepped by a single timer, so a tick costs the same
+# however the players are spread across arenas.
+#
+# Protocol (over TCP):
+#   client -> server: 3-byte messages, struct '<BH' (kind, value)
+#     join_message, arena number   - join an arena (created when its first player joins)
+#     turn_message, direction code - turn (codes follow snake_engine.directions: left, right, up, down)
+#   server -> client: frames made of a 4-byte little-endian length and a payload whose first byte is the kind
+#     welcome_frame: player id, cols, rows, tick rate (varints)
+#     snapshot_frame / delta_frame: tick, number of cells, then (gap from the previous cell, content) per cell,
+#       number of players, then (player id, status, [score, deaths, [head cell]]) per player (all varints).
+#       A snapshot lists every occupied cell; a delta lists only the cells that changed on that tick.
+#       Cell contents and player states use the constants below and in snake_arena.
+#
+# Usage: python snake_server.py --port 8765
+
+import argparse     # For command line options
+import asyncio      # For serving many connections from one thread
+import logging      # For reporting ticks that overrun
+import struct       # For the fixed-size messages and frame lengths
+from collections import deque  # Recent tick durations
+from time import perf_counter  # High resolution timer
+
+from snake_arena import Arena
+from snake_engine import base_snake_speed, directions, height, num_obstacles, width
+from snake_replay import write_varint
+
+# Client messages
+message_format = struct.Struct('<BH')
+join_message = 1
+turn_message = 2
+
+# Server frames
+frame_header = struct.Struct('<I')
+welcome_frame = 1
+snapshot_frame = 2
+delta_frame = 3
+
+# Player states sent in snapshot and delta frames
+player_left = 0
+player_alive = 1
+player_waiting = 2  # Dead, waiting to respawn
+
+# Direction codes used by turn messages
+direction_names = list(directions.keys())
+
+# A client with more than this many bytes still unsent is skipped, and sent a snapshot once it catches up
+max_buffered_bytes = 1 << 16
+
+logger = logging.getLogger(__name__)
+
+
+def frame(payload):
+    """Return a payload with its length in front."""
+    return frame_header.pack(len(payload)) + payload
+
+
+def encode_state(kind, arena, cells, players):
+    """Encode the given cells and players of an arena as a snapshot or delta frame."""
+    data = bytearray((kind,))
+    write_varint(data, arena.tick)
+    write_varint(data, len(cells))
+    previous = 0
+    for cell in cells:
+        # Cells are sorted, so each is stored as the (usually small) gap from the previous one
+        write_varint(data, cell - previous)
+        write_varint(data, arena.cell_content(cell))
+        previous = cell
+    write_varint(data, len(players))
+    for player_id in players:
+        write_varint(data, player_id)
+        snake = arena.players.get(player_id)
+        if snake is None:
+            write_varint(data, player_left)
+            continue
+        write_varint(data, player_alive if snake.alive else player_waiting)
+        write_varint(data, snake.score)
+        write_varint(data, snake.deaths)
+        if snake.alive:
+            write_varint(data, snake.body.head())
+    return frame(bytes(data))
+
+
+class Connection:
+    """A connected player."""
+
+    def __init__(self, writer, room, player_id):
+        """Remember where to send a player's frames."""
+        self.writer = writer
+        self.room = room
+        self.player_id = player_id
+        self.needs_snapshot = True  # Send the whole arena next tick (on joining, or after falling behind)
+
+
+class Room:
+    """An arena and the players connected to it."""
+
+    def __init__(self, number, arena):
+        """Wrap an arena."""
+        self.number = number
+        self.arena = arena
+        self.connections = {}  # Connection by player id
+        self.next_player_id = 0
+
+    def snapshot(self):
+        """Encode the whole arena (every occupied cell and every player)."""
+        arena = self.arena
+        # Collect the occupied cells from the objects on the board rather than scanning every cell
+        cells = set(arena.obstacles)
+        if arena.food is not None:
+            cells.add(arena.food)
+        for snake in arena.players.values():
+            cells.update(snake.body)
+        return encode_state(snapshot_frame, arena, sorted(cells), sorted(arena.players))
+
+    def tick(self):
+        """Step the arena and send each player the changes (or a snapshot if they need one)."""
+        self.arena.step()
+        cells, players = self.arena.take_changes()
+        delta = encode_state(delta_frame, self.arena, cells, players)
+        snapshot = None
+        for connection in self.connections.values():
+            transport = connection.writer.transport
+            if transport.is_closing():
+                continue
+            if transport.get_write_buffer_size() > max_buffered_bytes:
+                # Too far behind: drop deltas until the backlog clears, then start over from a snapshot
+                connection.needs_snapshot = True
+                continue
+            if connection.needs_snapshot:
+                if snapshot is None:
+                    snapshot = self.snapshot()
+                connection.writer.write(snapshot)
+                connection.needs_snapshot = False
+            else:
+                connection.writer.write(delta)
+
+
+class SnakeServer:
+    """Hosts arenas for players connecting over TCP and steps them all at a fixed tick rate."""
+
+    def __init__(self, tick_rate=base_snake_speed, width=width, height=height, num_obstacles=num_obstacles,
+                 seed=None):
+        """Set up a server whose arenas use the given board settings (seed is used for arena 0, then counts up)."""
+        self.tick_rate = tick_rate
+        self.board = (width, height, num_obstacles)
+        self.seed = seed
+        self.rooms = {}                          # Room by arena number
+        self.tick_times = deque(maxlen=1000)     # Recent durations of a whole server tick (seconds)
+        self.paused = False                      # Stops the arenas (connections stay open)
+        self.server = None
+        self.ticker = None
+
+    async def start(self, host='127.0.0.1', port=8765):
+        """Start accepting players and ticking; returns the port in use (useful with port 0)."""
+        self.server = await asyncio.start_server(self.handle_client, host, port)
+        self.ticker = asyncio.create_task(self.tick_loop())
+        return self.server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        """Stop ticking and close every connection."""
+        self.ticker.cancel()
+        self.server.close()
+        for room in self.rooms.values():
+            for connection in room.connections.values():
+                connection.writer.close()
+        await self.server.wait_closed()
+
+    def room(self, number):
+        """Return the room for an arena number, creating it if needed."""
+        room = self.rooms.get(number)
+        if room is None:
+            seed = None if self.seed is None else self.seed + number
+            room = self.rooms[number] = Room(number, Arena(*self.board, seed=seed))
+        return room
+
+    async def handle_client(self, reader, writer):
+        """Serve one player: wait for a join message, then apply their turns until they disconnect."""
+        connection = None
+        try:
+            kind, number = message_format.unpack(await reader.readexactly(message_format.size))
+            if kind != join_message:
+                return
+            room = self.room(number)
+            player_id = room.next_player_id
+            room.next_player_id += 1
+            room.arena.add_player(player_id)
+            connection = room.connections[player_id] = Connection(writer, room, player_id)
+
+            welcome = bytearray((welcome_frame,))
+            for value in (player_id, room.arena.cols, room.arena.rows, self.tick_rate):
+                write_varint(welcome, value)
+            writer.write(frame(bytes(welcome)))
+
+            while True:
+                kind, value = message_format.unpack(await reader.readexactly(message_format.size))
+                if kind == turn_message and value < len(direction_names):
+                    room.arena.queue_turn(player_id, direction_names[value])
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            if connection is not None:
+                # Take the player out, and drop the arena once it is empty
+                room = connection.room
+                del room.connections[connection.player_id]
+                room.arena.remove_player(connection.player_id)
+                if not room.connections:
+                    del self.rooms[room.number]
+            writer.close()
+
+    async def tick_loop(self):
+        """Step every arena tick_rate times a second."""
+        loop = asyncio.get_running_loop()
+        interval = 1 / self.tick_rate
+        next_tick = loop.time()
+        while True:
+            next_tick += interval
+            if not self.paused:
+                start = perf_counter()
+                for room in list(self.rooms.values()):
+                    room.tick()
+                self.tick_times.append(perf_counter() - start)
+            delay = next_tick - loop.time()
+            if delay < 0:
+                # Running behind: start counting again from now rather than rushing through missed ticks
+                logger.warning("Tick overran by %.1f ms", -delay * 1000)
+                next_tick = loop.time()
+                delay = 0
+            await asyncio.sleep(delay)
+
+    def tick_summary(self):
+        """Return the p50 and p99 duration of recent server ticks, in milliseconds."""
+        if not self.tick_times:
+            return 0, 0
+        ordered = sorted(self.tick_times)
+        p50 = ordered[len(ordered) // 2]
+        p99 = ordered[min(len(ordered) - 1, len(ordered) * 99 // 100)]
+        return p50 * 1000, p99 * 1000
+
+
+async def serve(host, port, tick_rate, seed):
+    """Run a server until the process is stopped."""
+    server = SnakeServer(tick_rate, seed=seed)
+    port = await server.start(host, port)
+    print(f"Serving Snake arenas on {host}:{port} at {tick_rate} ticks per second")
+    await asyncio.Event().wait()
+
+
+def main(argv=None):
+    """Command line entry point for the server."""
+    parser = argparse.ArgumentParser(description='Host multiplayer Snake arenas.')
+    parser.add_argument('--host', default='127.0.0.1', help='address to listen on')
+    parser.add_argument('--port', type=int, default=8765, help='port to listen on')
+    parser.add_argument('--tick-rate', type=int, default=base_snake_speed, help='ticks per second')
+    parser.add_argument('--seed', type=int, default=None, help='seed of arena 0 (later arenas count up from it)')
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(serve(args.host, args.port, args.tick_rate, args.seed))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()